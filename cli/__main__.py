@@ -18,7 +18,7 @@ import json
 from chatnoir_api.model import Index
 from click import Context, Parameter
 from click import Path as PathType
-from click import argument, confirm, echo, group, option
+from click import BadParameter, Choice, argument, clear, confirm, echo, group, option
 from doccano_client import DoccanoClient
 from doccano_client.exceptions import DoccanoAPIError
 from doccano_client.models.data_upload import Task as DataUploadTask
@@ -299,7 +299,9 @@ def convert_topics_csv_to_xml(
 
 @cli.command()
 @argument(
-    "course_path",
+    "course_paths",
+    nargs=-1,
+    required=True,
     type=PathType(
         exists=True,
         file_okay=False,
@@ -317,20 +319,38 @@ def convert_topics_csv_to_xml(
     default=1000,
     help="Pooling depth.",
 )
+@option(
+    "--bundle/--no-bundle",
+    default=False,
+    show_default=True,
+    help="Also prebuild a PyTerrier index, an offset-indexed docstore, and a docno lookup table (with checksums).",
+)
+@option(
+    "--jobs",
+    type=int,
+    default=1,
+    show_default=True,
+    help="Number of courses to subsample at the same time.",
+)
 def subsample_corpus(
-    course_path: Path,
+    course_paths: tuple[Path, ...],
     pooling_depth: int,
+    bundle: bool,
+    jobs: int,
 ) -> None:
     """
     Create a subsample of a potentially huge corpus for experiments against a fixed set of corpora.
+    Pass several course directories to subsample them in one process, which loads each corpus only once.
     """
-    from cli.tirex import subsample_corpus
-    subsample_corpus(course_path / 'qrels.txt', course_path, pooling_depth)
+    from cli.tirex import subsample_corpora
+    subsample_corpora(course_paths, pooling_depth, bundle, jobs)
 
 
 @cli.command()
 @argument(
-    "directory",
+    "directories",
+    nargs=-1,
+    required=True,
     type=PathType(
         exists=True,
         file_okay=False,
@@ -346,19 +366,607 @@ def subsample_corpus(
     default=10,
     help="Pooling depth.",
 )
+@option(
+    "--strategy",
+    "pooling_strategy",
+    type=Choice(["topX", "rrf", "rbp", "mtf", "adaptive-depth"]),
+    default="topX",
+    show_default=True,
+    help="Pooling strategy: fixed-depth top-X pooling, reciprocal rank fusion or rank-biased precision priority, move-to-front pooling, or top-X pooling with a depth per topic chosen to cover the most within a total budget.",
+)
+@option(
+    "--budget",
+    "pooling_budget",
+    type=int,
+    default=None,
+    help="Judgment budget for the rrf, rbp, and mtf pooling strategies (documents per topic) and the adaptive-depth strategy (documents over all topics, i.e., the total for all judging groups).",
+)
+@option(
+    "--re-rank-depth",
+    type=int,
+    default=0,
+    help="Re-rank the top-k documents of the BM25 runs with MonoT5, TCT-ColBERT, and ANCE (0 disables re-ranking).",
+)
+@option(
+    "--threads",
+    type=int,
+    default=None,
+    help="Number of CPU threads to use for neural re-ranking.",
+)
+@option(
+    "--chatnoir-workers",
+    type=int,
+    default=4,
+    help="Number of concurrent ChatNoir queries.",
+)
+@option(
+    "--chatnoir-rate-limit",
+    type=float,
+    default=4.0,
+    help="Maximum number of ChatNoir requests per second.",
+)
+@option(
+    "--index-text/--no-index-text",
+    default=True,
+    show_default=True,
+    help="Store the document texts in the PyTerrier index (with --no-index-text, the index only stores the document IDs and texts are looked up in a document store).",
+)
+@option(
+    "--retrieval-backend",
+    type=Choice(["terrier", "sparse"]),
+    default="terrier",
+    show_default=True,
+    help="Retrieve the baseline runs with Terrier or with an in-process sparse-matrix scorer (no JVM, slightly different text processing).",
+)
+@option(
+    "--prior-qrels",
+    type=PathType(
+        exists=True,
+        file_okay=True,
+        dir_okay=False,
+        readable=True,
+        resolve_path=True,
+        allow_dash=False,
+        path_type=Path,
+    ),
+    multiple=True,
+    help="Qrels of earlier judgments (can be given multiple times). Pooled pairs judged there are not judged again, export-relevance-judgments merges their labels back in.",
+)
+@option(
+    "--graph-expansion",
+    type=int,
+    default=0,
+    show_default=True,
+    help="Add up to this many nearest neighbours (in a BM25 corpus graph of the retrieved documents) of the known relevant documents of each topic to its pool.",
+)
+@option(
+    "--near-duplicate-threshold",
+    type=float,
+    default=None,
+    help="Judge only one document per cluster of near-duplicates, i.e., pooled documents whose estimated Jaccard similarity of word 5-grams is at least this threshold (e.g., 0.8). export-relevance-judgments copies the judgment to the other documents of the cluster.",
+)
+@option(
+    "--jobs",
+    type=int,
+    default=1,
+    show_default=True,
+    help="Number of CPU-bound pipeline stages (indexing, retrieval, re-ranking) to run at the same time, over all courses.",
+)
+@option(
+    "--io-jobs",
+    type=int,
+    default=4,
+    show_default=True,
+    help="Number of network-bound pipeline stages (ChatNoir runs) to run at the same time.",
+)
 def pool_documents(
-    directory: Path,
+    directories: tuple[Path, ...],
     pooling_depth: int,
+    pooling_strategy: str,
+    pooling_budget: int | None,
+    re_rank_depth: int,
+    threads: int | None,
+    chatnoir_workers: int,
+    chatnoir_rate_limit: float,
+    index_text: bool,
+    retrieval_backend: str,
+    near_duplicate_threshold: float | None,
+    prior_qrels: tuple[Path, ...],
+    graph_expansion: int,
+    jobs: int,
+    io_jobs: int,
 ) -> None:
     """
     Create top-k pools of documents retrieved by TIREx baselines using ChatNoir.
+    Pass several course directories to pool them in one batch that shares the runtime, caches, and ChatNoir session.
     """
     from cli.tirex import pool_documents
 
+    if pooling_strategy != "topX" and pooling_budget is None:
+        raise BadParameter(f"The pooling strategy '{pooling_strategy}' requires a budget.", param_hint="'--budget'")
+
     pool_documents(
-        path=directory,
+        path=list(directories),
         pooling_depth=pooling_depth,
+        pooling_strategy=pooling_strategy,
+        pooling_budget=pooling_budget,
+        re_rank_depth=re_rank_depth,
+        threads=threads,
+        chatnoir_workers=chatnoir_workers,
+        chatnoir_requests_per_second=chatnoir_rate_limit,
+        index_text=index_text,
+        retrieval_backend=retrieval_backend,
+        near_duplicate_threshold=near_duplicate_threshold,
+        prior_qrels=prior_qrels,
+        graph_expansion=graph_expansion,
+        jobs=jobs,
+        io_jobs=io_jobs,
+    )
+
+
+@cli.command()
+@argument(
+    "directory",
+    type=PathType(
+        exists=True,
+        file_okay=False,
+        dir_okay=True,
+        resolve_path=True,
+        allow_dash=False,
+        path_type=Path,
+    ),
+)
+@option(
+    "-r",
+    "--runs",
+    "run_dirs",
+    type=PathType(
+        exists=True,
+        file_okay=False,
+        dir_okay=True,
+        readable=True,
+        resolve_path=True,
+        allow_dash=False,
+        path_type=Path,
+    ),
+    multiple=True,
+    help="Additional directories with (gzipped) runs to evaluate, e.g., student runs.",
+)
+@option(
+    "-k",
+    "--cutoff",
+    "cutoffs",
+    type=int,
+    multiple=True,
+    default=[10],
+    show_default=True,
+    help="Cutoffs for nDCG@k, P@k, and judged@k.",
+)
+@option(
+    "--per-topic-path",
+    type=PathType(
+        exists=False,
+        file_okay=True,
+        dir_okay=False,
+        writable=True,
+        resolve_path=True,
+        allow_dash=False,
+        path_type=Path,
+    ),
+    default=None,
+    help="Also write the per-topic scores of all runs to this CSV file.",
+)
+def evaluate(
+    directory: Path,
+    run_dirs: Sequence[Path],
+    cutoffs: Sequence[int],
+    per_topic_path: Path | None,
+) -> None:
+    """
+    Evaluate the baseline runs (and additional runs) against the qrels.txt of a course directory.
+    The leaderboard with nDCG@k, P@k, MAP, bpref, and judged@k of all runs is saved to leaderboard.csv.
+    """
+    from cli.evaluation import evaluate_runs
+
+    config_data = json.loads((directory / "config.json").read_text())
+    run_paths = [
+        path
+        for run_dir in (directory / config_data["runs"], *run_dirs)
+        for path in run_dir.glob("*.gz")
+    ]
+    echo(f"Evaluate {len(run_paths)} runs.")
+    leaderboard, per_topic = evaluate_runs(directory / "qrels.txt", run_paths, cutoffs)
+
+    leaderboard_path = directory / "leaderboard.csv"
+    leaderboard.to_csv(leaderboard_path)
+    echo(leaderboard.head(20).to_string())
+    echo(f"Saved leaderboard to {leaderboard_path}.")
+    if per_topic_path is not None:
+        per_topic.to_csv(per_topic_path, index=False)
+        echo(f"Saved per-topic scores to {per_topic_path}.")
+
+
+@cli.command()
+@argument(
+    "per_topic_path",
+    type=PathType(
+        exists=True,
+        file_okay=True,
+        dir_okay=False,
+        readable=True,
+        resolve_path=True,
+        allow_dash=False,
+        path_type=Path,
+    ),
+)
+@option(
+    "-m",
+    "--measure",
+    type=str,
+    default="nDCG@10",
+    show_default=True,
+    help="Measure of the per-topic scores to test.",
+)
+@option(
+    "--trials",
+    type=int,
+    default=10000,
+    show_default=True,
+    help="Number of randomization and bootstrap trials.",
+)
+@option(
+    "--seed",
+    type=int,
+    default=0,
+    show_default=True,
+    help="Seed of the random number generator.",
+)
+@option(
+    "--confidence",
+    type=float,
+    default=0.95,
+    show_default=True,
+    help="Confidence level of the bootstrap confidence intervals.",
+)
+@option(
+    "--correction",
+    type=Choice(["holm", "bonferroni", "fdr_bh", "none"]),
+    default="holm",
+    show_default=True,
+    help="Multiple comparison correction of the p-values.",
+)
+@option(
+    "-j",
+    "--jobs",
+    type=int,
+    default=None,
+    help="Number of processes to use (default: number of CPUs).",
+)
+def significance(
+    per_topic_path: Path,
+    measure: str,
+    trials: int,
+    seed: int,
+    confidence: float,
+    correction: str,
+    jobs: int | None,
+) -> None:
+    """
+    Test all pairs of runs for significant differences with paired randomization tests and bootstrap confidence intervals.
+    PER_TOPIC_PATH is a per-topic scores file written by the evaluate command.
+    The corrected p-values are saved as a run-by-run matrix next to it.
+    """
+    from cli.significance import significance_tests
+
+    per_topic = read_csv(per_topic_path, dtype={"qid": str})
+    per_topic = per_topic[per_topic["measure"] == measure]
+    if len(per_topic) == 0:
+        raise ValueError(f"No per-topic scores for measure '{measure}'.")
+    scores = per_topic.pivot(index="run", columns="qid", values="score").fillna(0)
+    echo(f"Test {len(scores)} runs on {len(scores.columns)} topics.")
+
+    matrix, details = significance_tests(
+        scores,
+        trials=trials,
+        seed=seed,
+        confidence=confidence,
+        correction=correction,
+        jobs=jobs,
     )
+    matrix_path = per_topic_path.parent / f"significance-{measure}.csv"
+    matrix.to_csv(matrix_path)
+    details.to_csv(per_topic_path.parent / f"significance-{measure}-pairs.csv", index=False)
+    echo(f"{(details['p_value_corrected'] < 1 - confidence).sum()} of {len(details)} pairs differ significantly.")
+    echo(f"Saved significance matrix to {matrix_path}.")
+
+
+@cli.command()
+@argument(
+    "directory",
+    type=PathType(
+        exists=True,
+        file_okay=False,
+        dir_okay=True,
+        resolve_path=True,
+        allow_dash=False,
+        path_type=Path,
+    ),
+)
+@option(
+    "-r",
+    "--runs",
+    "run_dirs",
+    type=PathType(
+        exists=True,
+        file_okay=False,
+        dir_okay=True,
+        readable=True,
+        resolve_path=True,
+        allow_dash=False,
+        path_type=Path,
+    ),
+    multiple=True,
+    help="Additional directories with (gzipped) runs that contributed to the pool.",
+)
+@option(
+    "--pooling-depth",
+    type=int,
+    default=10,
+    help="Pooling depth.",
+)
+@option(
+    "-m",
+    "--measure",
+    type=str,
+    default="nDCG@10",
+    show_default=True,
+    help="Measure to compare with and without the left-out runs.",
+)
+@option(
+    "--leave-out",
+    type=Choice(["run", "directory"]),
+    default="run",
+    show_default=True,
+    help="Leave out single runs or all runs of a directory (e.g., of one group) at once.",
+)
+def reusability(
+    directory: Path,
+    run_dirs: Sequence[Path],
+    pooling_depth: int,
+    measure: str,
+    leave_out: str,
+) -> None:
+    """
+    Analyze the reusability of the qrels.txt of a course directory by leave-one-run-out (or leave-one-group-out) re-evaluation.
+    The unique judged documents and the score drop of each run are saved to reusability.csv.
+    """
+    from cli.evaluation import leave_one_out, run_names
+
+    config_data = json.loads((directory / "config.json").read_text())
+    run_paths = [
+        path
+        for run_dir in (directory / config_data["runs"], *run_dirs)
+        for path in run_dir.glob("*.gz")
+    ]
+    # Directories are named by their full path, as the runs directory and others may have the same name.
+    groups = {
+        name: (name if leave_out == "run" else str(path.parent))
+        for path, name in run_names(run_paths).items()
+    }
+    echo(f"Analyze {len(run_paths)} runs in {len(set(groups.values()))} groups.")
+    result = leave_one_out(directory / "qrels.txt", run_paths, pooling_depth, measure, groups)
+
+    result_path = directory / "reusability.csv"
+    result.to_csv(result_path, index=False)
+    echo(result.head(20).to_string(index=False))
+    echo(f"Saved reusability analysis to {result_path}.")
+
+
+@cli.command()
+@argument(
+    "directory",
+    type=PathType(
+        exists=True,
+        file_okay=False,
+        dir_okay=True,
+        resolve_path=True,
+        allow_dash=False,
+        path_type=Path,
+    ),
+)
+@option(
+    "-r",
+    "--runs",
+    "run_dirs",
+    type=PathType(
+        exists=True,
+        file_okay=False,
+        dir_okay=True,
+        readable=True,
+        resolve_path=True,
+        allow_dash=False,
+        path_type=Path,
+    ),
+    multiple=True,
+    help="Additional directories with (gzipped) runs to validate, e.g., submitted runs.",
+)
+@option(
+    "--jobs",
+    type=int,
+    default=None,
+    help="Number of processes (default: number of CPUs).",
+)
+def validate_runs(
+    directory: Path,
+    run_dirs: Sequence[Path],
+    jobs: int | None,
+) -> None:
+    """
+    Validate all (gzipped) runs of a course directory before pooling: the column count, numeric ranks and scores,
+    duplicate documents, ranks that contradict the scores, and unknown or missing topics.
+    The problems of each run are saved to run-validation.csv. Exits with status 1 if some run is invalid.
+    """
+    from cli.run_validation import read_topic_ids, validate_runs
+
+    config_path = directory / "config.json"
+    if config_path.exists():
+        config_data = json.loads(config_path.read_text())
+        run_paths = sorted((directory / config_data["runs"]).glob("*.gz"))
+        topics_path = directory / config_data["topics"]
+    else:
+        # The runs of a course directory to subsample.
+        run_paths = sorted(directory.glob("*-run.gz"))
+        topics_path = directory / "topics.xml"
+    run_paths += [path for run_dir in run_dirs for path in sorted(run_dir.glob("*.gz"))]
+    topic_ids = read_topic_ids(topics_path) if topics_path.exists() else None
+    if topic_ids is None:
+        echo(f"Missing topics {topics_path}, skip the topic checks.")
+
+    echo(f"Validate {len(run_paths)} runs.")
+    report = validate_runs(run_paths, topic_ids, jobs)
+    report_path = directory / "run-validation.csv"
+    report.to_csv(report_path, index=False)
+
+    invalid = report[~report["valid"]]
+    for _, row in invalid.iterrows():
+        echo(f"{row['path']}: {row['errors']}")
+    echo(f"{len(invalid)} of {len(report)} runs are invalid, {(report['warnings'] != '').sum()} have warnings.")
+    echo(f"Saved validation report to {report_path}.")
+    if len(invalid) > 0:
+        raise SystemExit(1)
+
+
+@cli.command()
+@argument(
+    "directory",
+    type=PathType(
+        exists=True,
+        file_okay=False,
+        dir_okay=True,
+        resolve_path=True,
+        allow_dash=False,
+        path_type=Path,
+    ),
+)
+@option(
+    "--accounts-path",
+    type=PathType(
+        exists=True,
+        file_okay=True,
+        dir_okay=False,
+        readable=True,
+        resolve_path=True,
+        allow_dash=False,
+        path_type=Path,
+    ),
+    required=True,
+    help="CSV file with the columns account and (optionally) group, i.e., the group whose topics the account must not judge.",
+)
+@option(
+    "--judges-per-topic",
+    type=int,
+    default=1,
+    show_default=True,
+    help="Number of different accounts that judge each topic.",
+)
+@option(
+    "--overwrite/--no-overwrite",
+    default=False,
+    show_default=True,
+    help="Overwrite an existing topic-mapping.jsonl.",
+)
+def assign_topics(
+    directory: Path,
+    accounts_path: Path,
+    judges_per_topic: int,
+    overwrite: bool,
+) -> None:
+    """
+    Assign the topics of a course directory to accounts such that the largest judgment load is minimal.
+    The loads are the sizes of the topics' pools in judgment-pool.json (created by pool-documents),
+    and the assignment is saved to topic-mapping.jsonl.
+    """
+    from cli.assignment import assign_topics, makespan_lower_bound
+    from cli.tirex import load_topics_dict
+
+    mapping_path = directory / "topic-mapping.jsonl"
+    if mapping_path.exists() and not overwrite:
+        echo(f"Exists {mapping_path}. Use --overwrite to replace it.")
+        return
+
+    pool = json.loads((directory / "judgment-pool.json").read_text())
+    pool_sizes = {str(topic): len(documents) for topic, documents in pool.items()}
+
+    accounts = read_csv(accounts_path, dtype=str)
+    if "group" not in accounts.columns:
+        accounts["group"] = accounts["account"]
+    accounts["group"] = accounts["group"].fillna(accounts["account"])
+    account_groups = {
+        row["account"].strip(): row["group"].strip().lower()
+        for _, row in accounts.iterrows()
+    }
+
+    config_data = json.loads((directory / "config.json").read_text())
+    topics_path = directory / config_data["topics"]
+    if str(topics_path).endswith(".xml"):
+        topic_groups = load_topics_dict(topics_path=topics_path, tag="group", tokenise=False)
+    else:
+        topics = read_csv(topics_path, dtype=str)
+        topic_groups = dict(zip(topics["qid"], topics["group"])) if "group" in topics.columns else {}
+    topic_groups = {
+        str(topic): str(group).strip().lower()
+        for topic, group in topic_groups.items()
+        if not isna(group)
+    }
+
+    assignment = assign_topics(pool_sizes, account_groups, topic_groups, judges_per_topic)
+    loads = {
+        account: sum(pool_sizes[topic] for topic in topics)
+        for account, topics in assignment.items()
+    }
+    lower_bound = makespan_lower_bound(pool_sizes, len(assignment), judges_per_topic)
+    echo(
+        f"Assigned {len(pool_sizes)} topics to {len(assignment)} accounts. "
+        f"Documents to judge per account: {min(loads.values())} (min), {max(loads.values())} (max), "
+        f"lower bound of the max: {lower_bound:.0f}."
+    )
+
+    with mapping_path.open("wt") as file:
+        for account, topics in assignment.items():
+            file.write(json.dumps({"account": account, "topics": topics}) + "\n")
+    echo(f"Saved topic mapping to {mapping_path}.")
+
+
+@cli.group()
+def cache() -> None:
+    """
+    Manage the machine-wide caches (in TEACHING_IR_CACHE_DIR, default: ~/.cache/teaching-ir).
+    """
+    pass
+
+
+@cache.command()
+def stats() -> None:
+    """
+    Show the size of the document cache per index and of the other caches.
+    """
+    from cli.caching import DocumentCache, default_cache_dir, table_sizes
+
+    document_cache = DocumentCache()
+    echo(f"Document cache: {document_cache.path}")
+    document_stats = document_cache.stats()
+    if len(document_stats) > 0:
+        echo(document_stats.to_string(index=False))
+    echo(
+        f"Total: {int(document_stats['size'].sum()) / 1024**2:.1f} MiB "
+        f"of {document_cache.max_size / 1024**2:.1f} MiB"
+    )
+
+    for path in sorted(default_cache_dir().glob("*.sqlite")):
+        if path == document_cache.path:
+            continue
+        entries = sum(table_sizes(path).values())
+        echo(f"{path.name}: {entries} entries, {path.stat().st_size / 1024**2:.1f} MiB")
 
 
 def _user_name(project_prefix: str, group: str) -> str:
@@ -999,6 +1607,24 @@ def export_relevance_judgments(
     qrels["label"] = qrels["label"].map(qrel_mapping)
     qrels = qrels[qrels["label"].notna()]
 
+    prior_qrels_path = Path(directory) / "prior-qrels.txt"
+    if prior_qrels_path.exists():
+        from cli.evaluation import read_qrels
+
+        prior = read_qrels(prior_qrels_path).rename(columns={"qid": "query_id", "docno": "doc_id", "rel": "label"})
+        judged = set(zip(qrels["query_id"].astype(str), qrels["doc_id"].astype(str)))
+        prior = prior[[i not in judged for i in zip(prior["query_id"], prior["doc_id"])]]
+        echo(f"Merge {len(prior)} prior judgments.")
+        qrels = concat([qrels, prior], ignore_index=True)
+
+    collapsed_path = Path(directory) / "collapsed-near-duplicates.json"
+    if collapsed_path.exists():
+        from cli.near_duplicates import propagate_judgments
+
+        num_judgments = len(qrels)
+        qrels = propagate_judgments(qrels, json.loads(collapsed_path.read_text()))
+        echo(f"Copied {len(qrels) - num_judgments} judgments to near-duplicates.")
+
     qrels_path = Path(directory) / "qrels.txt"
     echo(f"Export qrels file to {qrels_path}.")
     qrels["Q0"] = 0
@@ -1006,6 +1632,106 @@ def export_relevance_judgments(
     qrels.to_csv(qrels_path, sep=" ", index=False, header=False)
 
 
+@cli.command()
+@option(
+    "-d",
+    "--doccano-url",
+    type=str,
+    required=True,
+    prompt="Doccano URL",
+    envvar="DOCCANO_URL",
+    help="Base URL of the Doccano instance to use.",
+    metavar="URL",
+)
+@option(
+    "-u",
+    "--doccano-username",
+    type=str,
+    required=True,
+    prompt="Doccano username",
+    envvar="DOCCANO_USERNAME",
+    help="Username to authenticate with Doccano.",
+)
+@option(
+    "-p",
+    "--doccano-password",
+    type=str,
+    required=True,
+    prompt="Doccano password",
+    hide_input=True,
+    envvar="DOCCANO_PASSWORD",
+    help="Password to authenticate with Doccano.",
+)
+@option(
+    "--watch",
+    type=float,
+    default=0,
+    help="Refresh the status every given number of seconds (0 shows the status once).",
+)
+@option(
+    "--ttl",
+    type=float,
+    default=30,
+    show_default=True,
+    help="Number of seconds for which the responses of a project are reused.",
+)
+@option(
+    "--workers",
+    type=int,
+    default=16,
+    show_default=True,
+    help="Number of projects to query concurrently.",
+)
+@argument(
+    "prefix",
+    type=str,
+)
+def judgment_status(
+    doccano_url: str,
+    doccano_username: str,
+    doccano_password: str,
+    watch: float,
+    ttl: float,
+    workers: int,
+    prefix: str,
+) -> None:
+    """
+    Show the judgment progress and throughput per group without exporting the judgments.
+    PREFIX is the common prefix of the generated project and user names.
+    """
+    from cli.judgment_status import JudgmentStatusPoller
+
+    if len(prefix) == 0:
+        raise ValueError("Empty project prefix.")
+
+    project_prefix = slugify(prefix)
+    doccano = DoccanoClient(doccano_url)
+    doccano.login(username=doccano_username, password=doccano_password)
+    echo("Successfully authenticated with Doccano API.")
+
+    projects: Sequence[Project] = [
+        project
+        for project in doccano.list_projects()
+        if project.name.startswith(project_prefix) and _TAG in project.tags
+    ]
+    echo(f"Found {len(projects)} projects.")
+    poller = JudgmentStatusPoller(doccano, workers=workers, ttl=ttl)
+    while True:
+        status = poller.poll(projects, project_prefix)
+        if watch > 0:
+            clear()
+        echo(status.to_string(index=False, float_format=lambda x: f"{x:.2f}"))
+        judged = status["judged"].sum()
+        examples = status["examples"].sum()
+        echo(
+            f"Judged {judged} of {examples} documents ({judged / max(examples, 1):.1%}), "
+            f"{status['judged/h'].sum():.0f} judgments per hour."
+        )
+        if watch <= 0:
+            break
+        sleep(watch)
+
+
 @cli.command()
 @option(
     "-d",
@@ -1127,31 +1853,58 @@ def clean_up(
     "country_of_teams",
     type=str,
 )
+@option(
+    "--initial-delay",
+    type=float,
+    default=1.0,
+    help="Initial delay in seconds between TIRA API calls (adapted to the server's responses).",
+)
+@option(
+    "--min-delay",
+    type=float,
+    default=0.5,
+    show_default=True,
+    help="Minimum delay in seconds between TIRA API calls.",
+)
+@option(
+    "--max-delay",
+    type=float,
+    default=60.0,
+    help="Maximum delay in seconds between TIRA API calls.",
+)
 def create_tira_groups(
     prefix: str,
     path: Path,
     tira_task_id: str,
     affiliation_of_teams: str,
     country_of_teams: str,
+    initial_delay: float,
+    min_delay: float,
+    max_delay: float,
 ) -> None:
     """
     Create the groups in tira.
     """
 
-    from cli.tirex import create_group
+    from cli.rate_limit import AdaptiveRateLimiter
+    from cli.tirex import create_groups
 
     topics = read_topics(path / "topics.xml")
     pool = read_pooled_for_topics([path / "doccano-judgment-pool.jsonl"], topics)
     groups = group_names(pool, prefix).values()
 
-    for group in [i for i in groups if 'tutors' not in i.lower()]:
-        create_group(
-            path / "tira-invites.json",
-            tira_task_id,
-            group,
-            affiliation_of_teams,
-            country_of_teams,
-        )
+    create_groups(
+        path / "tira-invites.json",
+        tira_task_id,
+        sorted(i for i in groups if 'tutors' not in i.lower()),
+        affiliation_of_teams,
+        country_of_teams,
+        rate_limiter=AdaptiveRateLimiter(
+            initial_delay=initial_delay,
+            min_delay=min_delay,
+            max_delay=max_delay,
+        ),
+    )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,91 @@
+from typing import Mapping
+
+
+def assign_topics(
+    pool_sizes: Mapping[str, int],
+    account_groups: Mapping[str, str],
+    topic_groups: Mapping[str, str] | None = None,
+    judges_per_topic: int = 1,
+) -> dict[str, list[str]]:
+    """
+    Assign the topics to accounts so that the largest judgment load of an account (the makespan) is minimal.
+    Each topic is judged by `judges_per_topic` different accounts, and no account judges a topic of its own group.
+    The topics are first assigned greedily in decreasing order of their pool sizes (LPT),
+    then topics are moved or swapped away from the most loaded account as long as that reduces its load.
+    """
+    topic_groups = topic_groups or {}
+    accounts = sorted(account_groups.keys())
+
+    def eligible(topic: str, account: str) -> bool:
+        group = topic_groups.get(topic)
+        return group is None or group != account_groups[account]
+
+    for topic in pool_sizes:
+        num_eligible = sum(eligible(topic, account) for account in accounts)
+        if num_eligible < judges_per_topic:
+            raise ValueError(
+                f"Topic {topic} can only be judged by {num_eligible} accounts, but needs {judges_per_topic} judges."
+            )
+
+    assignment: dict[str, set[str]] = {account: set() for account in accounts}
+    loads = {account: 0 for account in accounts}
+    for topic in sorted(pool_sizes, key=lambda i: (-pool_sizes[i], i)):
+        for _ in range(judges_per_topic):
+            account = min(
+                (i for i in accounts if eligible(topic, i) and topic not in assignment[i]),
+                key=lambda i: (loads[i], len(assignment[i]), i),
+            )
+            assignment[account].add(topic)
+            loads[account] += pool_sizes[topic]
+
+    def can_take(account: str, topic: str) -> bool:
+        return eligible(topic, account) and topic not in assignment[account]
+
+    # Each accepted move or swap strictly reduces the sum of squared loads, so the search terminates.
+    improved = True
+    while improved:
+        improved = False
+        busiest = max(accounts, key=lambda i: (loads[i], i))
+        best = None
+        for topic in assignment[busiest]:
+            size = pool_sizes[topic]
+            for other in accounts:
+                if other == busiest:
+                    continue
+                if can_take(other, topic) and loads[other] + size < loads[busiest]:
+                    candidate = (max(loads[busiest] - size, loads[other] + size), topic, other, "")
+                    best = min(best, candidate) if best is not None else candidate
+                for other_topic in assignment[other]:
+                    difference = size - pool_sizes[other_topic]
+                    if (
+                        difference > 0
+                        and loads[other] + difference < loads[busiest]
+                        and can_take(other, topic)
+                        and can_take(busiest, other_topic)
+                    ):
+                        candidate = (
+                            max(loads[busiest] - difference, loads[other] + difference),
+                            topic,
+                            other,
+                            other_topic,
+                        )
+                        best = min(best, candidate) if best is not None else candidate
+        if best is not None:
+            _, topic, other, other_topic = best
+            assignment[busiest].remove(topic)
+            assignment[other].add(topic)
+            loads[busiest] -= pool_sizes[topic]
+            loads[other] += pool_sizes[topic]
+            if other_topic:
+                assignment[other].remove(other_topic)
+                assignment[busiest].add(other_topic)
+                loads[other] -= pool_sizes[other_topic]
+                loads[busiest] += pool_sizes[other_topic]
+            improved = True
+
+    return {account: sorted(topics, key=lambda i: (-pool_sizes[i], i)) for account, topics in assignment.items()}
+
+
+def makespan_lower_bound(pool_sizes: Mapping[str, int], num_accounts: int, judges_per_topic: int = 1) -> float:
+    total = sum(pool_sizes.values()) * judges_per_topic
+    return max(total / num_accounts, max(pool_sizes.values(), default=0))
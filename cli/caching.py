@@ -0,0 +1,323 @@
+from json import dumps, loads
+from os import environ
+from pathlib import Path
+from sqlite3 import Connection, connect
+from threading import Lock
+from time import time
+from typing import Any, Callable, Iterable, Mapping
+from zlib import compress, decompress
+
+from pandas import DataFrame
+
+# SQLite limits the number of host parameters per statement.
+_MAX_PARAMETERS = 500
+
+# Defaults of the machine-wide document cache: 2 GiB of compressed documents, retry failed fetches after a day.
+_DEFAULT_DOCUMENT_CACHE_SIZE = 2 * 1024**3
+_DEFAULT_NEGATIVE_TTL = 24 * 60 * 60
+# A full document cache is shrunk to this fraction of its size, so that not every following insert evicts.
+_EVICTION_TARGET = 0.9
+
+
+def default_cache_dir() -> Path:
+    if "TEACHING_IR_CACHE_DIR" in environ:
+        return Path(environ["TEACHING_IR_CACHE_DIR"])
+    return Path.home() / ".cache" / "teaching-ir"
+
+
+def _connect(path: Path) -> Connection:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    connection = connect(str(path), timeout=60, check_same_thread=False)
+    connection.execute("PRAGMA journal_mode=WAL")
+    return connection
+
+
+def table_sizes(path: Path) -> dict[str, int]:
+    connection = _connect(path)
+    try:
+        tables = [i for i, in connection.execute("SELECT name FROM sqlite_master WHERE type = 'table'")]
+        return {i: connection.execute(f"SELECT COUNT(*) FROM [{i}]").fetchone()[0] for i in tables}
+    finally:
+        connection.close()
+
+
+class SqliteCache:
+    """
+    Persistent key-value cache for JSON-serializable values, backed by a SQLite table.
+    The cache can be shared by threads and by concurrent processes.
+    """
+
+    def __init__(self, path: Path, table: str = "cache") -> None:
+        self.path = path
+        self.table = table
+        self._lock = Lock()
+        self._connection = _connect(path)
+        self._connection.execute(
+            f"CREATE TABLE IF NOT EXISTS [{table}] "
+            "(key TEXT PRIMARY KEY, value TEXT NOT NULL, created REAL NOT NULL)"
+        )
+        self._connection.commit()
+
+    def get_many(self, keys: Iterable[str]) -> dict[str, Any]:
+        keys = list(keys)
+        ret = {}
+        with self._lock:
+            for start in range(0, len(keys), _MAX_PARAMETERS):
+                chunk = keys[start : start + _MAX_PARAMETERS]
+                placeholders = ", ".join("?" * len(chunk))
+                rows = self._connection.execute(
+                    f"SELECT key, value FROM [{self.table}] WHERE key IN ({placeholders})",
+                    chunk,
+                )
+                for key, value in rows:
+                    ret[key] = loads(value)
+        return ret
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self.get_many([key]).get(key, default)
+
+    def put_many(self, items: Mapping[str, Any]) -> None:
+        now = time()
+        with self._lock:
+            self._connection.executemany(
+                f"INSERT OR REPLACE INTO [{self.table}] (key, value, created) VALUES (?, ?, ?)",
+                ((key, dumps(value), now) for key, value in items.items()),
+            )
+            self._connection.commit()
+
+    def put(self, key: str, value: Any) -> None:
+        self.put_many({key: value})
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.get_many([key])
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute(
+                f"SELECT COUNT(*) FROM [{self.table}]"
+            ).fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+
+class RetrievalCache:
+    """
+    Cache of rankings per (index, model, field, query) that keeps the deepest ranking seen so far.
+    Shallower requests are served by truncating the cached rankings,
+    deeper requests only retrieve the queries whose cached rankings are too shallow.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self._cache = SqliteCache(path, table="retrieval")
+
+    @staticmethod
+    def _key(index: str, model: str, field: str, query: str) -> str:
+        return dumps([index, model, field, query])
+
+    def retrieve(
+        self,
+        topics: DataFrame,
+        retrieve: Callable[[DataFrame, int], DataFrame],
+        index: str,
+        model: str,
+        field: str,
+        depth: int,
+    ) -> DataFrame:
+        keys = {
+            str(qid): self._key(index, model, field, query)
+            for qid, query in zip(topics["qid"], topics["query"])
+        }
+        entries = self._cache.get_many(keys.values())
+
+        def is_deep_enough(key: str) -> bool:
+            if key not in entries:
+                return False
+            entry = entries[key]
+            # A ranking shorter than its depth contains all results there are.
+            return entry["depth"] >= depth or len(entry["results"]) < entry["depth"]
+
+        missing = topics[[not is_deep_enough(keys[str(qid)]) for qid in topics["qid"]]]
+        print(f"Retrieve {len(missing)} of {len(topics)} queries ({len(topics) - len(missing)} cached).")
+        if len(missing) > 0:
+            run = retrieve(missing, depth)
+            run = run.astype({"qid": str}).sort_values(["qid", "rank"])
+            results: dict[str, list] = {str(qid): [] for qid in missing["qid"]}
+            for qid, docno, score in zip(run["qid"], run["docno"], run["score"]):
+                results[qid].append([docno, float(score)])
+            new_entries = {
+                keys[qid]: {"depth": depth, "results": ranking}
+                for qid, ranking in results.items()
+            }
+            self._cache.put_many(new_entries)
+            entries.update(new_entries)
+
+        rows = []
+        for qid, query in zip(topics["qid"], topics["query"]):
+            for rank, (docno, score) in enumerate(entries[keys[str(qid)]]["results"][:depth]):
+                rows.append({"qid": qid, "query": query, "docno": docno, "rank": rank, "score": score})
+        return DataFrame(rows, columns=["qid", "query", "docno", "rank", "score"])
+
+
+class DocumentCache:
+    """
+    Machine-wide cache of fetched documents per (index, docno), shared by all course directories.
+    Documents are stored compressed and the least recently used ones are evicted once the cache exceeds its size
+    (default: `TEACHING_IR_DOCUMENT_CACHE_SIZE` bytes).
+    Failed fetches are stored as negative entries that expire after a TTL, so that they are not retried on every run.
+    """
+
+    def __init__(
+        self,
+        path: Path | None = None,
+        max_size: int | None = None,
+        negative_ttl: float = _DEFAULT_NEGATIVE_TTL,
+    ) -> None:
+        if max_size is None:
+            max_size = int(environ.get("TEACHING_IR_DOCUMENT_CACHE_SIZE", _DEFAULT_DOCUMENT_CACHE_SIZE))
+        self.path = path or default_cache_dir() / "documents.sqlite"
+        self.max_size = max_size
+        self.negative_ttl = negative_ttl
+        self._lock = Lock()
+        self._connection = _connect(self.path)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS documents "
+            "(key TEXT PRIMARY KEY, corpus TEXT NOT NULL, value BLOB, size INTEGER NOT NULL, "
+            "created REAL NOT NULL, accessed REAL NOT NULL, hits INTEGER NOT NULL DEFAULT 0)"
+        )
+        self._connection.execute("CREATE INDEX IF NOT EXISTS documents_accessed ON documents (accessed)")
+        self._connection.commit()
+        # The size is tracked on insert, so that only inserts beyond the size evict (and sum the exact size again).
+        self._size = self._total_size()
+
+    @staticmethod
+    def _key(index: str, docno: str) -> str:
+        return dumps([index, docno])
+
+    def get_many(self, index: str, docnos: Iterable[str]) -> tuple[dict[str, dict], set[str]]:
+        """
+        Return the cached documents and the docnos whose fetch failed recently (i.e., within the TTL).
+        """
+        keys = {self._key(index, docno): docno for docno in docnos}
+        now = time()
+        documents = {}
+        failed = set()
+        with self._lock:
+            all_keys = list(keys.keys())
+            for start in range(0, len(all_keys), _MAX_PARAMETERS):
+                chunk = all_keys[start : start + _MAX_PARAMETERS]
+                placeholders = ", ".join("?" * len(chunk))
+                rows = self._connection.execute(
+                    f"SELECT key, value, created FROM documents WHERE key IN ({placeholders})",
+                    chunk,
+                ).fetchall()
+                hits = []
+                for key, value, created in rows:
+                    if value is not None:
+                        documents[keys[key]] = loads(decompress(value))
+                        hits.append(key)
+                    elif created + self.negative_ttl > now:
+                        failed.add(keys[key])
+                self._connection.executemany(
+                    "UPDATE documents SET accessed = ?, hits = hits + 1 WHERE key = ?",
+                    ((now, key) for key in hits),
+                )
+            self._connection.commit()
+        return documents, failed
+
+    def put_many(self, index: str, documents: Mapping[str, dict]) -> None:
+        now = time()
+        rows = []
+        for docno, document in documents.items():
+            value = compress(dumps(document).encode())
+            rows.append((self._key(index, docno), index, value, len(value), now, now))
+        with self._lock:
+            replaced = self._sizes([row[0] for row in rows])
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO documents (key, corpus, value, size, created, accessed) VALUES (?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._connection.commit()
+            self._size += sum(row[3] for row in rows) - replaced
+            full = self._size > self.max_size
+        if full:
+            self.evict()
+
+    def put(self, index: str, docno: str, document: dict) -> None:
+        self.put_many(index, {docno: document})
+
+    def put_failures(self, index: str, docnos: Iterable[str]) -> None:
+        now = time()
+        keys = [self._key(index, docno) for docno in docnos]
+        with self._lock:
+            replaced = self._sizes(keys)
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO documents (key, corpus, value, size, created, accessed) VALUES (?, ?, NULL, 0, ?, ?)",
+                ((key, index, now, now) for key in keys),
+            )
+            self._connection.commit()
+            self._size -= replaced
+
+    def _total_size(self) -> int:
+        return self._connection.execute("SELECT COALESCE(SUM(size), 0) FROM documents").fetchone()[0]
+
+    def _sizes(self, keys: list[str]) -> int:
+        # The summed size of the cached entries with the keys.
+        size = 0
+        for start in range(0, len(keys), _MAX_PARAMETERS):
+            chunk = keys[start : start + _MAX_PARAMETERS]
+            placeholders = ", ".join("?" * len(chunk))
+            size += self._connection.execute(
+                f"SELECT COALESCE(SUM(size), 0) FROM documents WHERE key IN ({placeholders})",
+                chunk,
+            ).fetchone()[0]
+        return size
+
+    def evict(self) -> int:
+        """
+        Remove expired negative entries and, if the cache exceeds its size, the least recently used documents
+        until it fits the eviction target.
+        Return the number of removed entries.
+        """
+        with self._lock:
+            removed = self._connection.execute(
+                "DELETE FROM documents WHERE value IS NULL AND created + ? <= ?",
+                (self.negative_ttl, time()),
+            ).rowcount
+            # Other processes may have changed the cache, so the exact size is summed.
+            excess = self._total_size() - self.max_size
+            if excess > 0:
+                excess += int(self.max_size * (1 - _EVICTION_TARGET))
+                keys = []
+                for key, size in self._connection.execute(
+                    "SELECT key, size FROM documents WHERE value IS NOT NULL ORDER BY accessed"
+                ):
+                    keys.append((key,))
+                    excess -= size
+                    if excess <= 0:
+                        break
+                self._connection.executemany("DELETE FROM documents WHERE key = ?", keys)
+                removed += len(keys)
+            self._connection.commit()
+            self._size = self._total_size()
+        return removed
+
+    def stats(self) -> DataFrame:
+        """
+        Return the number of documents, failed fetches, compressed size, and hits per index.
+        """
+        with self._lock:
+            return DataFrame(
+                self._connection.execute(
+                    "SELECT corpus, "
+                    "SUM(value IS NOT NULL), SUM(value IS NULL AND created + ? > ?), SUM(size), SUM(hits) "
+                    "FROM documents GROUP BY corpus ORDER BY corpus",
+                    (self.negative_ttl, time()),
+                ).fetchall(),
+                columns=["index", "documents", "failed", "size", "hits"],
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
@@ -0,0 +1,115 @@
+from concurrent.futures import ThreadPoolExecutor
+from json import dumps
+from os import environ
+from pathlib import Path
+from typing import Any
+from uuid import NAMESPACE_URL, uuid5
+
+from chatnoir_api.constants import BASE_URL
+from chatnoir_api.defaults import DEFAULT_API_KEY
+from chatnoir_api.model import index_id, index_prefix
+from pandas import DataFrame
+from requests import session
+from tqdm import tqdm
+
+from cli.caching import SqliteCache, default_cache_dir
+from cli.rate_limit import AdaptiveRateLimiter
+
+
+class ChatNoirQueryExecutor:
+    """
+    Run ChatNoir queries and fetch documents concurrently under one rate limit and HTTP session.
+    The raw search responses are recorded in a cache shared by all courses and fields on the machine,
+    and replayed for later requests of the same query with the same or a smaller depth.
+    The API endpoint and key default to the `CHATNOIR_URL` and `CHATNOIR_API_KEY` environment variables,
+    e.g., to point the executor to a local stand-in server.
+    """
+
+    def __init__(
+        self,
+        base_url: str | None = None,
+        api_key: str | None = None,
+        cache_path: Path | None = None,
+        workers: int = 4,
+        requests_per_second: float = 4.0,
+        timeout: int = 60,
+    ) -> None:
+        self.base_url = (base_url or environ.get("CHATNOIR_URL", BASE_URL)).rstrip("/")
+        self.api_key = api_key or environ.get("CHATNOIR_API_KEY", DEFAULT_API_KEY)
+        self.workers = workers
+        self.timeout = timeout
+        self._cache = SqliteCache(cache_path or default_cache_dir() / "chatnoir-responses.sqlite", table="responses")
+        min_delay = 1 / requests_per_second
+        self._rate_limiter = AdaptiveRateLimiter(initial_delay=min_delay, min_delay=min_delay)
+        self._session = session()
+
+    def _request(self, query: str, index: str, search_method: str, size: int) -> dict[str, Any]:
+        response = self._session.post(
+            f"{self.base_url}/api/v1/_search",
+            json={
+                "apikey": self.api_key,
+                "query": query,
+                "index": [index_id(index)],
+                "from": 0,
+                "size": size,
+                "explain": False,
+                "minimal": False,
+                "search_method": search_method,
+            },
+            timeout=self.timeout,
+        )
+        response.raise_for_status()
+        return response.json()
+
+    def search(self, query: str, index: str, search_method: str, size: int) -> list[dict[str, Any]]:
+        key = dumps([index_id(index), search_method, query])
+        recorded = self._cache.get(key)
+        # A recording with fewer results than requested contains all results there are.
+        if recorded is not None and (recorded["size"] >= size or len(recorded["response"]["results"]) < recorded["size"]):
+            return recorded["response"]["results"][:size]
+
+        response = self._rate_limiter.call(self._request, query, index, search_method, size)
+        self._cache.put(key, {"size": size, "response": response})
+        return response["results"][:size]
+
+    def _request_contents(self, doc_id: str, index: str) -> str:
+        # The same request as chatnoir_api.cache_contents, but with the executor's session.
+        response = self._session.get(
+            f"{self.base_url}/cache",
+            params={
+                "uuid": str(uuid5(NAMESPACE_URL, f"{index_prefix(index)}:{doc_id}")),
+                "index": index_id(index),
+                "raw": "true",
+                "plain": "false",
+            },
+            timeout=self.timeout,
+        )
+        response.raise_for_status()
+        return response.text
+
+    def cache_contents(self, doc_id: str, index: str) -> str:
+        """
+        Fetch the raw contents of a document from ChatNoir's cache.
+        """
+        return self._rate_limiter.call(self._request_contents, doc_id, index)
+
+    def retrieve(self, topics: DataFrame, index: str, search_method: str, depth: int) -> DataFrame:
+        queries = list(zip(topics["qid"], topics["query"]))
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            results = list(
+                tqdm(
+                    executor.map(lambda i: self.search(i[1], index, search_method, depth), queries),
+                    "Searching with ChatNoir",
+                    total=len(queries),
+                    unit="query",
+                )
+            )
+
+        rows = []
+        for (qid, query), query_results in zip(queries, results):
+            query_results = [i for i in query_results if i.get("trec_id") is not None]
+            # Rank by score, the API order breaks ties.
+            query_results = sorted(query_results, key=lambda i: -i["score"])
+            for rank, result in enumerate(query_results):
+                rows.append({"qid": qid, "query": query, "docno": result["trec_id"], "rank": rank, "score": result["score"]})
+        return DataFrame(rows, columns=["qid", "query", "docno", "rank", "score"])
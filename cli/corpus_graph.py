@@ -0,0 +1,138 @@
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from json import dumps, loads
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Iterable
+
+from numpy import argpartition, argsort, concatenate, float32, full, int32, load, ndarray, save
+from scipy.sparse import csr_matrix
+
+from cli.sparse_retrieval import SparseIndex, query_term_weights
+
+# Number of documents scored as queries per task of the worker processes.
+_BATCH_SIZE = 1024
+
+# Index and weights of a worker process, loaded once by the initializer.
+_worker: dict = {}
+
+
+def _init_worker(index_path: Path) -> None:
+    index = SparseIndex.load(index_path)
+    weights = index.weight_matrix("BM25").tocsr()
+    _worker["weights"] = weights
+    _worker["transposed"] = weights.T.tocsr()
+    _worker["frequencies"] = index.matrix.tocsr()
+
+
+def _neighbours(start: int, end: int, k: int, query_terms: int) -> tuple[ndarray, ndarray]:
+    weights, transposed, frequencies = _worker["weights"], _worker["transposed"], _worker["frequencies"]
+    # Each document queries with its query_terms highest-weighted terms, weighted by their frequency like BM25 queries.
+    rows, columns, values = [], [], []
+    for i in range(start, end):
+        row = slice(weights.indptr[i], weights.indptr[i + 1])
+        top = argsort(-weights.data[row], kind="stable")[:query_terms]
+        columns.append(weights.indices[row][top])
+        values.append(query_term_weights("BM25", frequencies.data[row][top].astype(float)))
+        rows.append(full(len(top), i - start))
+    queries = csr_matrix(
+        (concatenate(values), (concatenate(rows), concatenate(columns))),
+        shape=(end - start, weights.shape[1]),
+    )
+    scores = (queries @ transposed).tocsr()
+
+    neighbours = full((end - start, k), -1, dtype=int32)
+    neighbour_scores = full((end - start, k), 0.0, dtype=float32)
+    for i in range(end - start):
+        row = slice(scores.indptr[i], scores.indptr[i + 1])
+        documents, document_scores = scores.indices[row], scores.data[row]
+        keep = (documents != start + i) & (document_scores > 0)
+        documents, document_scores = documents[keep], document_scores[keep]
+        if len(documents) > k:
+            top = argpartition(-document_scores, k - 1)[:k]
+            documents, document_scores = documents[top], document_scores[top]
+        order = argsort(-document_scores, kind="stable")
+        neighbours[i, : len(order)] = documents[order]
+        neighbour_scores[i, : len(order)] = document_scores[order]
+    return neighbours, neighbour_scores
+
+
+class CorpusGraph:
+    """
+    The k nearest neighbours of each document by BM25, with the document's top terms as query (like for adaptive re-ranking).
+    Stored as (documents x k) arrays of neighbour positions (-1 if there are fewer neighbours) and scores.
+    """
+
+    def __init__(self, docnos: list[str], neighbours: ndarray, scores: ndarray) -> None:
+        self.docnos = docnos
+        self.neighbours = neighbours
+        self.scores = scores
+        self._positions = {docno: i for i, docno in enumerate(docnos)}
+
+    @classmethod
+    def build(
+        cls,
+        index_path: Path,
+        k: int = 16,
+        query_terms: int = 32,
+        workers: int | None = None,
+    ) -> "CorpusGraph":
+        """
+        Build the graph from a saved sparse index, scoring batches of documents in parallel processes.
+        """
+        docnos = loads((index_path / "docnos.json").read_text())
+        batches = [(i, min(i + _BATCH_SIZE, len(docnos))) for i in range(0, len(docnos), _BATCH_SIZE)]
+        if len(batches) == 0:
+            return cls(docnos, full((0, k), -1, dtype=int32), full((0, k), 0.0, dtype=float32))
+        starts, ends = zip(*batches)
+        if len(batches) == 1 or workers == 1:
+            _init_worker(index_path)
+            try:
+                parts = list(map(partial(_neighbours, k=k, query_terms=query_terms), starts, ends))
+            finally:
+                _worker.clear()
+        else:
+            # Spawn the workers, as forking a process that runs a JVM or other threads is not safe.
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(index_path,),
+            ) as executor:
+                parts = list(executor.map(partial(_neighbours, k=k, query_terms=query_terms), starts, ends))
+        return cls(docnos, concatenate([i[0] for i in parts]), concatenate([i[1] for i in parts]))
+
+    def save(self, path: Path) -> None:
+        path.mkdir(parents=True, exist_ok=True)
+        (path / "docnos.json").write_text(dumps(self.docnos))
+        save(path / "neighbours.npy", self.neighbours)
+        save(path / "scores.npy", self.scores)
+
+    @classmethod
+    def load(cls, path: Path) -> "CorpusGraph":
+        return cls(
+            loads((path / "docnos.json").read_text()),
+            load(path / "neighbours.npy"),
+            load(path / "scores.npy"),
+        )
+
+    def neighbours_of(self, docno: str, k: int | None = None) -> list[str]:
+        position = self._positions.get(docno)
+        if position is None:
+            return []
+        return [self.docnos[i] for i in self.neighbours[position, :k] if i >= 0]
+
+    def expand(self, docnos: Iterable[str], k: int | None = None) -> list[str]:
+        """
+        Neighbours of the given documents that are not among them, strongest first (by their best score).
+        """
+        docnos = set(docnos)
+        best: dict[int, float] = {}
+        for docno in docnos:
+            position = self._positions.get(docno)
+            if position is None:
+                continue
+            for neighbour, score in zip(self.neighbours[position, :k], self.scores[position, :k]):
+                if neighbour >= 0 and self.docnos[neighbour] not in docnos:
+                    best[int(neighbour)] = max(best.get(int(neighbour), 0.0), float(score))
+        return [self.docnos[i] for i in sorted(best, key=lambda i: (-best[i], self.docnos[i]))]
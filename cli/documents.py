@@ -0,0 +1,125 @@
+from gzip import open as gzip_open
+from json import dumps, loads
+from pathlib import Path
+from typing import Any, Iterable
+
+from numpy import array, int64, load, save
+from pandas import DataFrame
+from pyterrier import Transformer
+from pyterrier.apply import generic
+
+from cli.caching import SqliteCache
+
+# Number of documents inserted into the store at once when syncing.
+_BATCH_SIZE = 10000
+
+
+class DocumentStore:
+    """
+    Look up the documents of a course directory (from documents.jsonl.gz) by docno, backed by a SQLite table.
+    The store is synced whenever the documents file changed,
+    so that the index only needs to store the docno and the text is loaded on demand.
+    """
+
+    def __init__(self, pooling_path: Path) -> None:
+        self.documents_path = pooling_path / "documents.jsonl.gz"
+        store_path = pooling_path / "document-store.sqlite"
+        self._documents = SqliteCache(store_path, table="documents")
+        self._state = SqliteCache(store_path, table="state")
+        self.sync()
+
+    def sync(self) -> None:
+        if not self.documents_path.exists():
+            return
+        stat = self.documents_path.stat()
+        state = [stat.st_size, stat.st_mtime_ns]
+        if self._state.get("documents") == state:
+            return
+
+        batch = {}
+        with gzip_open(self.documents_path, "rt") as file:
+            for line in file:
+                try:
+                    document = loads(line)
+                except ValueError:
+                    # Skip lines truncated by an interrupted fetch.
+                    continue
+                batch[str(document["docno"])] = document
+                if len(batch) >= _BATCH_SIZE:
+                    self._documents.put_many(batch)
+                    batch = {}
+        self._documents.put_many(batch)
+        self._state.put("documents", state)
+
+    def get_many(self, docnos: Iterable[str]) -> dict[str, dict[str, Any]]:
+        return self._documents.get_many(docnos)
+
+    def get(self, docno: str) -> dict[str, Any] | None:
+        return self._documents.get(docno)
+
+    def __contains__(self, docno: str) -> bool:
+        return docno in self._documents
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    def text_loader(self, field: str = "text") -> Transformer:
+        """
+        Transformer that adds the given field of the documents to a result frame, like `pyterrier.text.get_text`.
+        """
+
+        def add_text(results: DataFrame) -> DataFrame:
+            documents = self.get_many(results["docno"].astype(str).unique())
+            texts = [documents.get(str(docno), {}).get(field, "") for docno in results["docno"]]
+            return results.assign(**{field: texts})
+
+        return generic(add_text)
+
+
+class OffsetDocumentStore:
+    """
+    Read-only document store of a JSON Lines file with the byte offsets of all documents, for random access without parsing the whole file.
+    The i-th document has the i-th docno in docnos.txt, which also matches the internal document IDs of an index built in the same order.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.docnos = (path / "docnos.txt").read_text().splitlines()
+        self.offsets = load(path / "offsets.npy")
+        self._positions = {docno: i for i, docno in enumerate(self.docnos)}
+        self._file = (path / "documents.jsonl").open("rb")
+
+    @staticmethod
+    def write(documents: Iterable[dict[str, Any]], path: Path) -> list[str]:
+        path.mkdir(parents=True, exist_ok=True)
+        docnos = []
+        offsets = [0]
+        with (path / "documents.jsonl").open("wb") as file:
+            for document in documents:
+                docnos.append(str(document["docno"]))
+                offsets.append(offsets[-1] + file.write((dumps(document) + "\n").encode("utf-8")))
+        (path / "docnos.txt").write_text("".join(f"{docno}\n" for docno in docnos))
+        save(path / "offsets.npy", array(offsets, dtype=int64))
+        return docnos
+
+    def get_by_position(self, position: int) -> dict[str, Any]:
+        start, end = self.offsets[position], self.offsets[position + 1]
+        self._file.seek(start)
+        return loads(self._file.read(end - start))
+
+    def get(self, docno: str) -> dict[str, Any] | None:
+        position = self._positions.get(docno)
+        return self.get_by_position(position) if position is not None else None
+
+    def get_many(self, docnos: Iterable[str]) -> dict[str, dict[str, Any]]:
+        positions = sorted((self._positions[docno], docno) for docno in docnos if docno in self._positions)
+        return {docno: self.get_by_position(position) for position, docno in positions}
+
+    def __contains__(self, docno: str) -> bool:
+        return docno in self._positions
+
+    def __len__(self) -> int:
+        return len(self.docnos)
+
+    def close(self) -> None:
+        self._file.close()
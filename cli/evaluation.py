@@ -0,0 +1,292 @@
+from collections import Counter
+from copy import copy
+from pathlib import Path
+from typing import Iterable, Mapping, Sequence
+
+from numpy import arange, log2, maximum, minimum, ndarray, where, zeros
+from pandas import DataFrame, Series, concat, read_csv
+from tqdm import tqdm
+
+# Maximum rank considered for the non-cutoff measures (MAP, bpref), as in trec_eval.
+_MAX_DEPTH = 1000
+
+
+def run_name(path: Path) -> str:
+    name = path.name
+    for suffix in (".gz", ".txt", ".run"):
+        name = name.removesuffix(suffix)
+    return name
+
+
+def run_names(paths: Iterable[Path]) -> dict[Path, str]:
+    """
+    Name the runs by their file names, qualified by their directory (e.g., parent/name) if several runs share a name.
+    """
+    names = {path: run_name(path) for path in paths}
+    shared = {name for name, count in Counter(names.values()).items() if count > 1}
+    names = {path: f"{path.parent.name}/{name}" if name in shared else name for path, name in names.items()}
+    duplicates = sorted(name for name, count in Counter(names.values()).items() if count > 1)
+    if len(duplicates) > 0:
+        raise ValueError(f"Runs with the same directory and file name: {', '.join(duplicates)}")
+    return names
+
+
+def read_qrels(path: Path) -> DataFrame:
+    return read_csv(
+        path,
+        sep=r"\s+",
+        header=None,
+        names=["qid", "q0", "docno", "rel"],
+        dtype={"qid": str, "q0": str, "docno": str, "rel": int},
+    )[["qid", "docno", "rel"]]
+
+
+def read_run(path: Path) -> DataFrame:
+    return read_csv(
+        path,
+        sep=r"\s+",
+        header=None,
+        names=["qid", "q0", "docno", "rank", "score", "system"],
+        dtype={"qid": str, "q0": str, "docno": str, "system": str},
+    )[["qid", "docno", "score"]]
+
+
+def rank_runs(runs: DataFrame, by: Sequence[str] = ("qid",), docno_ascending: bool = False) -> DataFrame:
+    """
+    Sort the results by descending score (breaking ties by descending document ID, like trec_eval,
+    or by ascending document ID, like the pooling with trectools) and number them per ranking in the column position (0-based).
+    """
+    by = list(by)
+    runs = runs.drop_duplicates([*by, "docno"])
+    runs = runs.sort_values([*by, "score", "docno"], ascending=[True] * len(by) + [False, docno_ascending])
+    return runs.assign(position=runs.groupby(by).cumcount())
+
+
+class RelevanceMatrix:
+    """
+    Relevance labels of many runs at once in a dense (runs x topics x ranks) integer array.
+    Unjudged documents are labeled -1 and ranks beyond the end of a ranking are labeled -2.
+    Negative labels in the qrels count as unjudged, like in trec_eval, so that they do not collide with these.
+    The topics are those of the qrels; topics without results in a run count as empty rankings.
+    """
+
+    def __init__(
+        self,
+        qrels: DataFrame,
+        runs: Mapping[str, DataFrame],
+        depth: int = _MAX_DEPTH,
+        topics: Sequence[str] | None = None,
+    ) -> None:
+        self.runs = list(runs.keys())
+        self.topics = sorted(topics if topics is not None else qrels["qid"].unique())
+        topic_ids = {qid: i for i, qid in enumerate(self.topics)}
+        qrels = qrels[qrels["rel"] >= 0]
+
+        run = concat(
+            [df.assign(run=i) for i, df in enumerate(runs.values())],
+            ignore_index=True,
+        )
+        run = rank_runs(run[run["qid"].isin(topic_ids.keys())], by=["run", "qid"])
+        run = run[run["position"] < depth]
+        run = run.merge(qrels, on=["qid", "docno"], how="left")
+        run["topic"] = run["qid"].map(topic_ids)
+        # The ranked documents and the judgments per run and topic, to remove judgments later on.
+        self._results = run[["run", "topic", "position", "qid", "docno"]].set_index("run").sort_index()
+
+        self.labels = zeros((len(self.runs), len(self.topics), depth), dtype="int8") - 2
+        self.labels[
+            run["run"].to_numpy(),
+            run["topic"].to_numpy(),
+            run["position"].to_numpy(),
+        ] = run["rel"].fillna(-1).to_numpy()
+
+        self._qrels = qrels[qrels["qid"].isin(topic_ids.keys())].set_index("qid").sort_index()
+        self.num_relevant = zeros(len(self.topics))
+        self.num_non_relevant = zeros(len(self.topics))
+        self.ideal_gains = zeros((len(self.topics), depth))
+        for qid, group in self._qrels.groupby(level="qid"):
+            self._set_judgments(topic_ids[qid], group["rel"])
+
+    def _set_judgments(self, topic: int, labels: Series) -> None:
+        self.num_relevant[topic] = (labels > 0).sum()
+        self.num_non_relevant[topic] = (labels <= 0).sum()
+        gains = sorted(labels.clip(lower=0), reverse=True)[: self.ideal_gains.shape[1]]
+        self.ideal_gains[topic] = 0
+        self.ideal_gains[topic, : len(gains)] = gains
+
+    def without_judgments(self, judgments: DataFrame, runs: Sequence[str]) -> "RelevanceMatrix":
+        """
+        Restrict the matrix to the given runs as if the judgments (columns qid and docno) were missing.
+        Only the ranks of the removed documents and the ideal rankings of their topics are updated.
+        """
+        run_ids = [self.runs.index(i) for i in runs]
+        matrix = copy(self)
+        matrix.runs = list(runs)
+        matrix.labels = self.labels[run_ids]
+        matrix.num_relevant = self.num_relevant.copy()
+        matrix.num_non_relevant = self.num_non_relevant.copy()
+        matrix.ideal_gains = self.ideal_gains.copy()
+
+        judgments = judgments[["qid", "docno"]].drop_duplicates()
+        if len(judgments) == 0:
+            return matrix
+        results = self._results.loc[run_ids].reset_index().merge(judgments, on=["qid", "docno"])
+        matrix.labels[
+            results["run"].map({run: i for i, run in enumerate(run_ids)}).to_numpy(),
+            results["topic"].to_numpy(),
+            results["position"].to_numpy(),
+        ] = -1
+
+        topic_ids = {qid: i for i, qid in enumerate(self.topics)}
+        topics = [qid for qid in judgments["qid"].unique() if qid in topic_ids]
+        qrels = self._qrels.loc[topics].reset_index()
+        qrels = qrels.merge(judgments, on=["qid", "docno"], how="left", indicator=True)
+        qrels = qrels[qrels["_merge"] == "left_only"]
+        for qid in topics:
+            matrix._set_judgments(topic_ids[qid], qrels.loc[qrels["qid"] == qid, "rel"])
+        return matrix
+
+    def precision(self, k: int) -> ndarray:
+        return (self.labels[:, :, :k] > 0).sum(axis=2) / k
+
+    def judged(self, k: int) -> ndarray:
+        return (self.labels[:, :, :k] >= 0).sum(axis=2) / k
+
+    def ndcg(self, k: int) -> ndarray:
+        discounts = 1 / log2(arange(k) + 2)
+        gains = maximum(self.labels[:, :, :k], 0)
+        dcg = (gains * discounts).sum(axis=2)
+        idcg = (self.ideal_gains[:, :k] * discounts).sum(axis=1)
+        return where(idcg > 0, dcg / where(idcg > 0, idcg, 1), 0)
+
+    def average_precision(self) -> ndarray:
+        relevant = self.labels > 0
+        precisions = relevant.cumsum(axis=2) / (arange(relevant.shape[2]) + 1)
+        num_relevant = where(self.num_relevant > 0, self.num_relevant, 1)
+        return (precisions * relevant).sum(axis=2) / num_relevant
+
+    def bpref(self) -> ndarray:
+        relevant = self.labels > 0
+        non_relevant = self.labels == 0
+        # Number of judged non-relevant documents ranked above each rank.
+        non_relevant_above = non_relevant.cumsum(axis=2) - non_relevant
+        r = self.num_relevant[:, None]
+        denominator = minimum(self.num_relevant, self.num_non_relevant)[:, None]
+        penalties = where(
+            denominator > 0,
+            minimum(non_relevant_above, r) / where(denominator > 0, denominator, 1),
+            0,
+        )
+        return ((1 - penalties) * relevant).sum(axis=2) / where(self.num_relevant > 0, self.num_relevant, 1)
+
+    def per_topic_scores(self, cutoffs: Sequence[int]) -> dict[str, ndarray]:
+        scores = {}
+        for k in cutoffs:
+            scores[f"nDCG@{k}"] = self.ndcg(k)
+            scores[f"P@{k}"] = self.precision(k)
+            scores[f"judged@{k}"] = self.judged(k)
+        scores["MAP"] = self.average_precision()
+        scores["bpref"] = self.bpref()
+        return scores
+
+
+def evaluate_runs(
+    qrels_path: Path,
+    run_paths: Iterable[Path],
+    cutoffs: Sequence[int] = (10,),
+) -> tuple[DataFrame, DataFrame]:
+    """
+    Evaluate all runs at once and return the leaderboard (mean scores per run)
+    and the per-topic scores (in long format with the columns run, measure, qid, and score).
+    Runs with the same file name are named by their directory and file name.
+    """
+    qrels = read_qrels(qrels_path)
+    runs = {name: read_run(path) for path, name in sorted(run_names(run_paths).items())}
+    matrix = RelevanceMatrix(qrels, runs, depth=max(_MAX_DEPTH, *cutoffs))
+    scores = matrix.per_topic_scores(cutoffs)
+
+    leaderboard = DataFrame(
+        {measure: values.mean(axis=1) for measure, values in scores.items()},
+        index=matrix.runs,
+    )
+    leaderboard.index.name = "run"
+    leaderboard = leaderboard.sort_values(f"nDCG@{cutoffs[0]}", ascending=False)
+
+    per_topic = concat(
+        [
+            DataFrame(values, index=matrix.runs, columns=matrix.topics)
+            .rename_axis(index="run", columns="qid")
+            .stack()
+            .rename("score")
+            .reset_index()
+            .assign(measure=measure)
+            for measure, values in scores.items()
+        ],
+        ignore_index=True,
+    )[["run", "measure", "qid", "score"]]
+    return leaderboard, per_topic
+
+
+def _cutoffs(measure: str) -> list[int]:
+    if "@" in measure:
+        return [int(measure.split("@")[-1])]
+    return [10]
+
+
+def leave_one_out(
+    qrels_path: Path,
+    run_paths: Iterable[Path],
+    pooling_depth: int,
+    measure: str = "nDCG@10",
+    groups: Mapping[str, str] | None = None,
+) -> DataFrame:
+    """
+    Estimate the reusability of the qrels by leaving out each run (or group of runs) from the pool.
+    The contributing groups per (qid, docno) are counted in a single pooling pass.
+    The judgments of the documents only contributed by the left-out group are then removed from the relevance matrix
+    of all runs to re-evaluate the group's runs, which only touches the group's own pool contributions.
+    """
+    qrels = read_qrels(qrels_path)
+    runs = {name: read_run(path) for path, name in sorted(run_names(run_paths).items())}
+    if groups is None:
+        groups = {name: name for name in runs}
+    topics = sorted(qrels["qid"].unique())
+
+    contributions = []
+    for name, df in runs.items():
+        # The pool's ranks, i.e., ties are broken like by trectools when pooling.
+        df = rank_runs(df, docno_ascending=True)
+        df = df[df["position"] < pooling_depth]
+        contributions.append(df[["qid", "docno"]].assign(group=groups[name]))
+    contributions = concat(contributions, ignore_index=True).drop_duplicates()
+    contributors = contributions.groupby(["qid", "docno"]).size().rename("contributors")
+    unique = contributions.join(contributors, on=["qid", "docno"])
+    unique = unique[unique["contributors"] == 1].merge(qrels, on=["qid", "docno"])
+    unique_by_group = {group: df for group, df in unique.groupby("group")}
+
+    cutoffs = _cutoffs(measure)
+    matrix = RelevanceMatrix(qrels, runs, topics=topics)
+    scores = matrix.per_topic_scores(cutoffs)[measure].mean(axis=1)
+    scores = dict(zip(runs.keys(), scores))
+
+    rows = []
+    for group in tqdm(sorted(set(groups.values())), "Leave one out", unit="group"):
+        members = [name for name in runs if groups[name] == group]
+        group_unique = unique_by_group.get(group, unique.iloc[:0])
+        reduced_scores = matrix.without_judgments(group_unique, members).per_topic_scores(cutoffs)[measure].mean(axis=1)
+        others = [score for other, score in scores.items() if groups[other] != group]
+        for name, reduced_score in zip(members, reduced_scores):
+            rows.append(
+                {
+                    "run": name,
+                    "group": group,
+                    "unique_judged": len(group_unique),
+                    "unique_relevant": int((group_unique["rel"] > 0).sum()),
+                    measure: scores[name],
+                    f"{measure} (left out)": reduced_score,
+                    "drop": scores[name] - reduced_score,
+                    "rank": 1 + sum(score > scores[name] for other, score in scores.items() if other != name),
+                    "rank (left out)": 1 + sum(score > reduced_score for score in others),
+                }
+            )
+    return DataFrame(rows).sort_values("drop", ascending=False)
@@ -0,0 +1,63 @@
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from time import monotonic
+from typing import Any, Sequence
+
+from doccano_client import DoccanoClient
+from doccano_client.models.project import Project
+from pandas import DataFrame
+
+
+class JudgmentStatusPoller:
+    """
+    Poll the number of examples and annotations of many Doccano projects concurrently.
+    Responses are reused for `ttl` seconds, and the throughput is measured since the first poll of each project.
+    """
+
+    def __init__(self, doccano: DoccanoClient, workers: int = 16, ttl: float = 30.0) -> None:
+        self.doccano = doccano
+        self.workers = workers
+        self.ttl = ttl
+        self._lock = Lock()
+        self._responses: dict[int, tuple[float, dict[str, Any]]] = {}
+        self._first_polls: dict[int, tuple[float, int]] = {}
+
+    def _fetch(self, project: Project) -> dict[str, Any]:
+        with self._lock:
+            cached = self._responses.get(project.id)
+        if cached is not None and monotonic() - cached[0] < self.ttl:
+            return cached[1]
+
+        examples = self.doccano.count_examples(project_id=project.id)
+        distributions = self.doccano.get_label_distribution(project_id=project.id, type="category")
+        annotations = sum(count.count for distribution in distributions for count in distribution.counts)
+        response = {"examples": examples, "judged": min(annotations, examples)}
+        now = monotonic()
+        with self._lock:
+            self._responses[project.id] = (now, response)
+            self._first_polls.setdefault(project.id, (now, response["judged"]))
+        return response
+
+    def poll(self, projects: Sequence[Project], prefix: str = "") -> DataFrame:
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            responses = list(executor.map(self._fetch, projects))
+
+        now = monotonic()
+        rows = []
+        for project, response in zip(projects, responses):
+            first_time, first_judged = self._first_polls[project.id]
+            hours = (now - first_time) / 3600
+            throughput = (response["judged"] - first_judged) / hours if hours > 0 else 0.0
+            remaining = response["examples"] - response["judged"]
+            rows.append(
+                {
+                    "group": project.name.removeprefix(prefix).lstrip("-"),
+                    "judged": response["judged"],
+                    "examples": response["examples"],
+                    "progress": response["judged"] / response["examples"] if response["examples"] > 0 else 1.0,
+                    "judged/h": throughput,
+                    "eta (h)": remaining / throughput if throughput > 0 else None,
+                }
+            )
+        columns = ["group", "judged", "examples", "progress", "judged/h", "eta (h)"]
+        return DataFrame(rows, columns=columns).sort_values(["progress", "group"]).reset_index(drop=True)
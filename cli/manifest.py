@@ -0,0 +1,127 @@
+from hashlib import sha256
+from json import dumps, loads
+from pathlib import Path
+from shutil import rmtree
+from threading import Lock
+from typing import Any, Iterable, Mapping
+
+
+def file_sha256(path: Path) -> str:
+    digest = sha256()
+    with path.open("rb") as file:
+        for chunk in iter(lambda: file.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class BuildManifest:
+    """
+    Record of the input hashes and parameters of the artifacts in a course directory (in build-manifest.json).
+    An artifact is stale if its inputs or parameters changed since it was built; stale artifacts are removed so that they get rebuilt.
+    Existing artifacts without a record (e.g., from before the manifest existed) are adopted as they are.
+    Artifacts recorded for a slot (e.g., the run of one retrieval model) are removed when another artifact is recorded for it,
+    e.g., when the run of a new depth supersedes that of the old depth.
+    File hashes are reused as long as the size and modification time of a file do not change.
+    """
+
+    def __init__(self, directory: Path, name: str = "build-manifest.json") -> None:
+        self.directory = directory
+        self.path = directory / name
+        self._lock = Lock()
+        data = loads(self.path.read_text()) if self.path.exists() else {}
+        self._artifacts: dict[str, str] = data.get("artifacts", {})
+        self._files: dict[str, list] = data.get("files", {})
+        self._slots: dict[str, str] = data.get("slots", {})
+
+    def _key(self, path: Path) -> str:
+        path = path.absolute()
+        directory = self.directory.absolute()
+        return str(path.relative_to(directory)) if path.is_relative_to(directory) else str(path)
+
+    def _save(self) -> None:
+        self.path.write_text(
+            dumps({"artifacts": self._artifacts, "files": self._files, "slots": self._slots}, indent=2, sort_keys=True)
+        )
+
+    def _file_hash(self, path: Path) -> str:
+        key = self._key(path)
+        stat = path.stat()
+        with self._lock:
+            cached = self._files.get(key)
+        if cached is not None and cached[0] == stat.st_size and cached[1] == stat.st_mtime_ns:
+            return cached[2]
+        # Hash without holding the lock, so that other stages are not blocked by large inputs.
+        digest = file_sha256(path)
+        with self._lock:
+            self._files[key] = [stat.st_size, stat.st_mtime_ns, digest]
+        return digest
+
+    def fingerprint(self, inputs: Iterable[Path], params: Mapping[str, Any] | None = None) -> str:
+        """
+        Hash of the contents of the input files (files in input directories count individually) and the parameters.
+        Missing inputs are part of the fingerprint, too.
+        """
+        hashes = {}
+        for path in inputs:
+            files = sorted(i for i in path.rglob("*") if i.is_file()) if path.is_dir() else [path]
+            for file in files:
+                hashes[self._key(file)] = self._file_hash(file) if file.exists() else None
+        return sha256(dumps([hashes, params or {}], sort_keys=True, default=str).encode()).hexdigest()
+
+    def artifact(self, target: Path) -> str | None:
+        """
+        Fingerprint of the recorded artifact, e.g., to use it as a parameter of artifacts derived from it.
+        """
+        with self._lock:
+            return self._artifacts.get(self._key(target))
+
+    def is_fresh(self, target: Path, inputs: Iterable[Path], params: Mapping[str, Any] | None = None) -> bool:
+        key = self._key(target)
+        fingerprint = self.fingerprint(inputs, params)
+        if not target.exists():
+            return False
+        with self._lock:
+            recorded = self._artifacts.get(key)
+            if recorded is None:
+                self._artifacts[key] = fingerprint
+                self._save()
+                return True
+            if recorded == fingerprint:
+                return True
+            del self._artifacts[key]
+            self._save()
+        print(f"Rebuild {key}, as its inputs or parameters changed.")
+        if target.is_dir():
+            rmtree(target)
+        else:
+            target.unlink()
+        return False
+
+    def record(
+        self,
+        target: Path,
+        inputs: Iterable[Path],
+        params: Mapping[str, Any] | None = None,
+        slot: str | None = None,
+    ) -> None:
+        fingerprint = self.fingerprint(inputs, params)
+        key = self._key(target)
+        superseded = None
+        with self._lock:
+            self._artifacts[key] = fingerprint
+            if slot is not None:
+                superseded = self._slots.get(slot)
+                self._slots[slot] = key
+                if superseded == key:
+                    superseded = None
+                elif superseded is not None:
+                    self._artifacts.pop(superseded, None)
+            self._save()
+        if superseded is not None:
+            path = self.directory / superseded
+            if path.exists():
+                print(f"Remove {superseded}, as {key} supersedes it.")
+                if path.is_dir():
+                    rmtree(path)
+                else:
+                    path.unlink()
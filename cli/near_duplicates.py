@@ -0,0 +1,150 @@
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from multiprocessing import get_context
+from re import compile
+from typing import Mapping, Sequence
+from zlib import crc32
+
+from numpy import full, fromiter, ndarray, outer, random, stack, uint64
+from pandas import DataFrame, concat
+
+_TOKEN = compile(r"\w+")
+# Mersenne prime for the universal hash functions that simulate the permutations.
+_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+# Number of documents per task of the worker processes.
+_CHUNK_SIZE = 1000
+
+
+def shingles(text: str, size: int = 5) -> set[int]:
+    """
+    Hashes of the word n-grams of the lower-cased text (texts shorter than `size` words form one shingle).
+    """
+    tokens = _TOKEN.findall(text.lower())
+    if len(tokens) == 0:
+        return set()
+    return {crc32(" ".join(tokens[i : i + size]).encode("utf-8")) for i in range(max(len(tokens) - size + 1, 1))}
+
+
+def _signatures(texts: Sequence[str], num_perm: int, shingle_size: int, seed: int) -> ndarray:
+    generator = random.default_rng(seed)
+    a = generator.integers(1, 1 << 32, num_perm, dtype=uint64)
+    b = generator.integers(0, 1 << 32, num_perm, dtype=uint64)
+    signatures = full((len(texts), num_perm), _MAX_HASH, dtype=uint64)
+    for i, text in enumerate(texts):
+        hashes = fromiter(shingles(text, shingle_size), dtype=uint64)
+        if len(hashes) > 0:
+            # The products of 32 bit values fit into 64 bit, so that the modulo is exact.
+            signatures[i] = (((outer(hashes, a) % _PRIME + b) % _PRIME) & _MAX_HASH).min(axis=0)
+    return signatures
+
+
+def _bands(threshold: float, num_perm: int) -> tuple[int, int]:
+    # Band the signatures so that pairs somewhat below the threshold still become candidates (the S-curve's midpoint),
+    # the candidates are verified with the full signatures afterwards.
+    target = max(threshold - 0.1, 0.0)
+    options = [(num_perm // rows, rows) for rows in range(1, num_perm + 1) if num_perm % rows == 0]
+    return max(options, key=lambda i: ((1 / i[0]) ** (1 / i[1]) <= target, -abs((1 / i[0]) ** (1 / i[1]) - target)))
+
+
+def find_near_duplicates(
+    documents: Mapping[str, str],
+    threshold: float = 0.8,
+    num_perm: int = 128,
+    shingle_size: int = 5,
+    workers: int | None = None,
+    seed: int = 1,
+    max_length: int | None = None,
+) -> list[list[str]]:
+    """
+    Cluster the documents (docno to text) whose estimated Jaccard similarity of shingles is at least the threshold,
+    with MinHash signatures (computed in parallel processes) and locality-sensitive hashing.
+    Returns the clusters with more than one document, each ordered by preference to judge it: longest text first,
+    but texts longer than max_length (that are truncated for judging) only after the others, shortest first.
+    Documents without any word are never clustered.
+    """
+
+    def preference(docno: str) -> tuple[bool, int, str]:
+        length = len(documents[docno])
+        too_long = max_length is not None and length > max_length
+        return too_long, length if too_long else -length, docno
+
+    docnos = sorted(documents.keys(), key=preference)
+    texts = [documents[i] for i in docnos]
+    chunks = [texts[i : i + _CHUNK_SIZE] for i in range(0, len(texts), _CHUNK_SIZE)]
+    if len(chunks) == 0:
+        return []
+    if len(chunks) == 1 or workers == 1:
+        signatures = stack([row for chunk in chunks for row in _signatures(chunk, num_perm, shingle_size, seed)])
+    else:
+        # Spawn the workers, as forking a process that runs a JVM or other threads is not safe.
+        with ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn")) as executor:
+            parts = list(executor.map(partial(_signatures, num_perm=num_perm, shingle_size=shingle_size, seed=seed), chunks))
+        signatures = stack([row for part in parts for row in part])
+
+    # Each cluster is represented by its preferred document (the one that comes first), all members must be near-duplicates
+    # of the representative itself so that similarities do not chain (A~B and B~C, but not A~C).
+    roots = list(range(len(docnos)))
+    members = {i: [i] for i in range(len(docnos))}
+
+    def similar(i: int, j: int) -> bool:
+        return (signatures[i] == signatures[j]).mean() >= threshold
+
+    empty = (signatures == _MAX_HASH).all(axis=1)
+    bands, rows = _bands(threshold, num_perm)
+    for band in range(bands):
+        buckets: dict[bytes, list[int]] = {}
+        for i, key in enumerate(signatures[:, band * rows : (band + 1) * rows]):
+            if not empty[i]:
+                buckets.setdefault(key.tobytes(), []).append(i)
+        for candidates in buckets.values():
+            for position, i in enumerate(candidates[1:], start=1):
+                for j in candidates[:position]:
+                    root, other = min(roots[i], roots[j]), max(roots[i], roots[j])
+                    if root != other and all(similar(root, k) for k in members[other]):
+                        for k in members[other]:
+                            roots[k] = root
+                        members[root].extend(members.pop(other))
+
+    clusters = [sorted(cluster) for _, cluster in sorted(members.items()) if len(cluster) > 1]
+    return [[docnos[i] for i in cluster] for cluster in clusters]
+
+
+def collapse_pool(pool: Mapping[str, Sequence[str]], clusters: Sequence[Sequence[str]]) -> dict[str, dict[str, list[str]]]:
+    """
+    For each topic, map the representative of each near-duplicate cluster in its pool (the preferred pooled document)
+    to the other pooled documents of the cluster, which need not be judged.
+    """
+    cluster_of = {docno: (i, rank) for i, cluster in enumerate(clusters) for rank, docno in enumerate(cluster)}
+    collapsed = {}
+    for topic, docnos in pool.items():
+        members: dict[int, list[tuple[int, str]]] = {}
+        for docno in docnos:
+            if docno in cluster_of:
+                cluster, rank = cluster_of[docno]
+                members.setdefault(cluster, []).append((rank, docno))
+        duplicates = {}
+        for pooled in members.values():
+            if len(pooled) > 1:
+                pooled = sorted(pooled)
+                duplicates[pooled[0][1]] = [docno for _, docno in pooled[1:]]
+        if len(duplicates) > 0:
+            collapsed[topic] = duplicates
+    return collapsed
+
+
+def propagate_judgments(qrels: DataFrame, collapsed: Mapping[str, Mapping[str, Sequence[str]]]) -> DataFrame:
+    """
+    Copy the judgments of the representatives (columns query_id, doc_id, and label) to their collapsed near-duplicates,
+    unless the near-duplicates are judged themselves.
+    """
+    judged = {(str(row.query_id), str(row.doc_id)) for row in qrels.itertuples()}
+    copies = []
+    for row in qrels.itertuples(index=False):
+        for docno in collapsed.get(str(row.query_id), {}).get(str(row.doc_id), []):
+            if (str(row.query_id), docno) not in judged:
+                copies.append(row._replace(doc_id=docno))
+                judged.add((str(row.query_id), docno))
+    if len(copies) == 0:
+        return qrels
+    return concat([qrels, DataFrame(copies, columns=qrels.columns)], ignore_index=True)
@@ -0,0 +1,92 @@
+from json import dumps
+from os import environ
+from pathlib import Path
+from typing import Iterable
+
+from requests import session
+from tqdm import tqdm
+
+from cli.caching import SqliteCache, default_cache_dir
+
+_DEFAULT_HOST = "https://elasticsearch.srv.webis.de:9200"
+_DEFAULT_INDEX = "chatnoir_meta_complete_msmarco_document_v2.1_segmented"
+
+
+class PassageIdResolver:
+    """
+    Map document IDs to the IDs of their passages in a segmented Elasticsearch index.
+    Lookups are batched into multi-search requests and cached locally, so that only unseen document IDs are requested.
+    The host and index default to the `ES_HOST` and `ES_INDEX` environment variables;
+    credentials are read from `ES_USER` and `ES_PASSWORD`, if set.
+    """
+
+    def __init__(
+        self,
+        host: str | None = None,
+        index: str | None = None,
+        cache_path: Path | None = None,
+        batch_size: int = 100,
+        max_passages: int = 1000,
+        timeout: int = 30,
+    ) -> None:
+        self.host = (host or environ.get("ES_HOST", _DEFAULT_HOST)).rstrip("/")
+        self.index = index or environ.get("ES_INDEX", _DEFAULT_INDEX)
+        self.batch_size = batch_size
+        self.max_passages = max_passages
+        self.timeout = timeout
+        self._cache = SqliteCache(
+            cache_path or default_cache_dir() / "passage-ids.sqlite",
+            table="passage_ids",
+        )
+        self._session = session()
+        if "ES_USER" in environ and "ES_PASSWORD" in environ:
+            self._session.auth = (environ["ES_USER"], environ["ES_PASSWORD"])
+
+    def _cache_key(self, doc_id: str) -> str:
+        return f"{self.index}/{doc_id}"
+
+    def _multi_search(self, doc_ids: list[str]) -> dict[str, list[str]]:
+        body = ""
+        for doc_id in doc_ids:
+            body += "{}\n"
+            body += dumps(
+                {
+                    "query": {"prefix": {"warc_trec_id": f"{doc_id}#"}},
+                    "_source": ["warc_trec_id"],
+                    "size": self.max_passages,
+                }
+            ) + "\n"
+
+        response = self._session.post(
+            f"{self.host}/{self.index}/_msearch",
+            data=body.encode("UTF-8"),
+            headers={"Content-Type": "application/x-ndjson"},
+            timeout=self.timeout,
+        )
+        response.raise_for_status()
+
+        ret = {}
+        for doc_id, result in zip(doc_ids, response.json()["responses"]):
+            if "error" in result:
+                raise RuntimeError(f"Failed to fetch passage IDs of {doc_id}: {result['error']}")
+            ids = {hit["_source"]["warc_trec_id"] for hit in result["hits"]["hits"]}
+            ret[doc_id] = sorted(ids)
+        return ret
+
+    def resolve(self, doc_ids: Iterable[str]) -> dict[str, list[str]]:
+        doc_ids = sorted(set(doc_ids))
+        cached = self._cache.get_many(self._cache_key(i) for i in doc_ids)
+        ret = {i: cached[self._cache_key(i)] for i in doc_ids if self._cache_key(i) in cached}
+        missing = [i for i in doc_ids if i not in ret]
+        if len(missing) > 0:
+            print(f"Fetch passage IDs for {len(missing)} documents ({len(ret)} cached).")
+
+        batches = [
+            missing[start : start + self.batch_size]
+            for start in range(0, len(missing), self.batch_size)
+        ]
+        for batch in tqdm(batches, "Fetch passage IDs", disable=len(batches) < 2):
+            fetched = self._multi_search(batch)
+            self._cache.put_many({self._cache_key(k): v for k, v in fetched.items()})
+            ret.update(fetched)
+        return ret
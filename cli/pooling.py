@@ -0,0 +1,205 @@
+from heapq import heapify, heappop, heappush
+from typing import Collection, Mapping, Sequence
+
+from pandas import DataFrame, concat
+from trectools import TrecRun
+
+# Persistence of the rank-biased weights used to estimate the recall of pools.
+_RECALL_RBP_P = 0.8
+
+
+def runs_to_frame(runs: Sequence[TrecRun]) -> DataFrame:
+    """
+    Concatenate runs into one frame with the columns query, docid, run (index), and rank (0-based).
+    The ranks are derived from the score order (ties broken by ascending docid, like trectools), not from the rank column.
+    """
+    frames = []
+    for i, run in enumerate(runs):
+        df = run.run_data[["query", "docid", "score"]].copy()
+        df["query"] = df["query"].astype(str)
+        df["docid"] = df["docid"].astype(str)
+        df = df.sort_values(["query", "score", "docid"], ascending=[True, False, True], kind="stable")
+        df = df.drop_duplicates(["query", "docid"])[["query", "docid"]]
+        df["run"] = i
+        df["rank"] = df.groupby("query").cumcount()
+        frames.append(df)
+    if len(frames) == 0:
+        return DataFrame(columns=["query", "docid", "run", "rank"])
+    return concat(frames, ignore_index=True)
+
+
+def fused_priorities(
+    runs: DataFrame,
+    method: str = "rrf",
+    rrf_k: int = 60,
+    rbp_p: float = 0.8,
+) -> DataFrame:
+    if method == "rrf":
+        weights = 1.0 / (rrf_k + runs["rank"] + 1)
+    elif method == "rbp":
+        weights = (1.0 - rbp_p) * rbp_p ** runs["rank"]
+    else:
+        raise ValueError(f"Unknown fusion method '{method}'.")
+
+    priorities = (
+        runs[["query", "docid"]]
+        .assign(priority=weights)
+        .groupby(["query", "docid"], as_index=False)["priority"]
+        .sum()
+    )
+    return priorities.sort_values(
+        ["query", "priority", "docid"], ascending=[True, False, True]
+    ).reset_index(drop=True)
+
+
+def _to_pool(df: DataFrame) -> dict[str, set[str]]:
+    return {str(query): set(docids) for query, docids in df.groupby("query")["docid"]}
+
+
+def top_x_pool(runs: DataFrame, depth: int) -> dict[str, set[str]]:
+    return _to_pool(runs[runs["rank"] < depth])
+
+
+def priority_pool(runs: DataFrame, budget: int, method: str) -> dict[str, set[str]]:
+    return _to_pool(fused_priorities(runs, method).groupby("query").head(budget))
+
+
+def move_to_front_pool(
+    runs: DataFrame,
+    budget: int,
+    relevant_documents: Mapping[str, Collection[str]],
+) -> dict[str, set[str]]:
+    """
+    Move-to-front pooling (Cormack et al., SIGIR 1998) with a per-topic judgment budget.
+    Without judgments at pooling time, the known relevant documents of a topic act as feedback:
+    runs that retrieve them move to the front and contribute more documents,
+    all other documents count as non-relevant.
+    """
+    pool = {}
+    for query, group in runs.sort_values("rank").groupby("query"):
+        query = str(query)
+        relevant = set(relevant_documents.get(query, []))
+        rankings = [list(i) for _, i in group.groupby("run")["docid"]]
+        positions = [0] * len(rankings)
+        priorities = [0] * len(rankings)
+        pooled: set[str] = set()
+        while len(pooled) < budget:
+            candidates = [i for i in range(len(rankings)) if positions[i] < len(rankings[i])]
+            if len(candidates) == 0:
+                break
+            run = max(candidates, key=lambda i: (priorities[i], -positions[i], -i))
+            document = rankings[run][positions[run]]
+            positions[run] += 1
+            if document in pooled:
+                continue
+            pooled.add(document)
+            priorities[run] += 1 if document in relevant else -1
+        pool[query] = pooled
+    return pool
+
+
+def adaptive_depths(runs: DataFrame, budget: int) -> dict[str, int]:
+    """
+    Choose a pooling depth per topic so that the pool has at most `budget` documents over all topics and covers most.
+    Starting from depth 0, the topics are deepened one level at a time, always taking the level that adds the most
+    estimated recall (rank-biased weight of the new documents relative to the topic's total weight) per new document.
+    A topic whose next level exceeds the remaining budget is not deepened any further.
+    """
+    # One pass over the runs: the depth at which a document enters the pool and its rank-biased weight.
+    documents = (
+        runs.assign(weight=(1.0 - _RECALL_RBP_P) * _RECALL_RBP_P ** runs["rank"])
+        .groupby(["query", "docid"], as_index=False)
+        .agg(level=("rank", "min"), weight=("weight", "sum"))
+    )
+    documents["weight"] /= documents.groupby("query")["weight"].transform("sum")
+    levels = documents.groupby(["query", "level"]).agg(cost=("docid", "size"), gain=("weight", "sum"))
+
+    # Levels without new documents are free, so each topic is a list of (depth after the level, cost, gain).
+    topics: dict[str, list[tuple[int, int, float]]] = {}
+    for (query, level), row in levels.iterrows():
+        topics.setdefault(str(query), []).append((int(level) + 1, int(row["cost"]), float(row["gain"])))
+
+    def value(level: tuple[int, int, float]) -> float:
+        return level[2] / level[1]
+
+    depths = {query: 0 for query in topics}
+    heap = [(-value(levels[0]), query, 0) for query, levels in topics.items()]
+    heapify(heap)
+    remaining = budget
+    while len(heap) > 0:
+        _, query, i = heappop(heap)
+        depth, cost, _ = topics[query][i]
+        if cost > remaining:
+            continue
+        remaining -= cost
+        depths[query] = depth
+        if i + 1 < len(topics[query]):
+            heappush(heap, (-value(topics[query][i + 1]), query, i + 1))
+    return depths
+
+
+def adaptive_depth_pool(runs: DataFrame, budget: int) -> dict[str, set[str]]:
+    depths = adaptive_depths(runs, budget)
+    pooled = runs[runs["rank"] < runs["query"].astype(str).map(depths)]
+    pool = _to_pool(pooled)
+    return {query: pool.get(query, set()) for query in depths}
+
+
+def order_pool(runs: DataFrame, pool: Mapping[str, Collection[str]], method: str = "rrf") -> dict[str, list[str]]:
+    """
+    Order the pooled documents of each topic by their fused priority over all runs (highest first),
+    so that the most promising documents get judged first if judging stops early.
+    """
+    pooled = DataFrame(
+        [(query, docid) for query, docids in pool.items() for docid in docids],
+        columns=["query", "docid"],
+    )
+    pooled = pooled.merge(fused_priorities(runs, method), on=["query", "docid"], how="left").fillna({"priority": 0.0})
+    pooled = pooled.sort_values(["query", "priority", "docid"], ascending=[True, False, True])
+    ordered = {str(query): list(docids) for query, docids in pooled.groupby("query", sort=False)["docid"]}
+    return {str(query): ordered.get(str(query), []) for query in pool}
+
+
+def make_pool(
+    runs: Sequence[TrecRun],
+    strategy: str,
+    depth: int,
+    budget: int | None = None,
+    relevant_documents: Mapping[str, Collection[str]] | None = None,
+) -> tuple[dict[str, list[str]], dict[str, float]]:
+    """
+    Pool the runs with the given strategy and estimate the recall of the pool per topic.
+    The pooled documents of each topic are ordered by reciprocal rank fusion over all runs.
+    Besides fixed-depth top-X pooling, the strategies select up to `budget` documents per topic,
+    except for adaptive-depth pooling, which selects up to `budget` documents over all topics.
+    """
+    runs_df = runs_to_frame(runs)
+    if strategy == "topX":
+        pool = top_x_pool(runs_df, depth)
+    elif budget is None:
+        raise ValueError(f"The pooling strategy '{strategy}' requires a judgment budget.")
+    elif strategy in ("rrf", "rbp"):
+        pool = priority_pool(runs_df, budget, strategy)
+    elif strategy == "mtf":
+        pool = move_to_front_pool(runs_df, budget, relevant_documents or {})
+    elif strategy == "adaptive-depth":
+        pool = adaptive_depth_pool(runs_df, budget)
+    else:
+        raise ValueError(f"Unknown pooling strategy '{strategy}'.")
+    return order_pool(runs_df, pool), estimate_recall(runs_df, pool)
+
+
+def estimate_recall(runs: DataFrame, pool: Mapping[str, Collection[str]]) -> dict[str, float]:
+    """
+    Estimate the recall of a pool as the share of the rank-biased weight (summed over all runs) that the pooled documents cover.
+    This assumes that the probability of relevance of a document decreases geometrically with its ranks.
+    """
+    priorities = fused_priorities(runs, "rbp", rbp_p=_RECALL_RBP_P)
+    pooled = DataFrame(
+        [(query, docid) for query, docids in pool.items() for docid in docids],
+        columns=["query", "docid"],
+    ).assign(pooled=True)
+    priorities = priorities.merge(pooled, on=["query", "docid"], how="left")
+    priorities["covered"] = priorities["priority"].where(priorities["pooled"].notna(), 0.0)
+    totals = priorities.groupby("query")[["covered", "priority"]].sum()
+    return (totals["covered"] / totals["priority"]).to_dict()
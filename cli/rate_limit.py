@@ -0,0 +1,122 @@
+from re import search
+from threading import Lock
+from time import monotonic, sleep
+from typing import Callable, TypeVar
+
+_T = TypeVar("_T")
+
+# Status codes that signal that the server is overloaded or throttling us.
+_RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+def _status_code(error: Exception) -> int | None:
+    response = getattr(error, "response", None)
+    status_code = getattr(response, "status_code", None)
+    if isinstance(status_code, int):
+        return status_code
+    # The TIRA client only reports the status code in the error message.
+    match = search(r"statuscode (\d{3})", str(error))
+    if match is not None:
+        return int(match.group(1))
+    return None
+
+
+def _is_retryable(error: Exception) -> bool:
+    return isinstance(error, (OSError, FailedResponse)) or _status_code(error) in _RETRYABLE_STATUS_CODES
+
+
+def _retry_after(error: Exception) -> float | None:
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if headers is None:
+        return None
+    try:
+        return float(headers.get("Retry-After"))
+    except (TypeError, ValueError):
+        return None
+
+
+class FailedResponse(Exception):
+    """
+    A response that signals a failure without the client raising an error,
+    e.g., the TIRA client returns the JSON of the last failed response after its own retries.
+    """
+
+
+class AdaptiveRateLimiter:
+    """
+    Space out calls to a remote API and adapt the spacing to the server's responses.
+    Successful calls shrink the delay between calls step by step,
+    whereas throttled calls or server errors double it and are retried.
+    The limiter is thread-safe and can be shared by concurrent workers.
+    """
+
+    def __init__(
+        self,
+        initial_delay: float = 1.0,
+        min_delay: float = 0.0,
+        max_delay: float = 60.0,
+        decrease_step: float = 0.25,
+        increase_factor: float = 2.0,
+        retries: int = 5,
+    ) -> None:
+        self.delay = initial_delay
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.decrease_step = decrease_step
+        self.increase_factor = increase_factor
+        self.retries = retries
+        self._lock = Lock()
+        self._next_call = monotonic()
+
+    def wait(self) -> None:
+        with self._lock:
+            now = monotonic()
+            start = max(now, self._next_call)
+            self._next_call = start + self.delay
+        if start > now:
+            sleep(start - now)
+
+    def success(self) -> None:
+        with self._lock:
+            self.delay = max(self.min_delay, self.delay - self.decrease_step)
+
+    def failure(self, retry_after: float | None = None) -> None:
+        with self._lock:
+            delay = max(self.delay, self.decrease_step) * self.increase_factor
+            if retry_after is not None:
+                delay = max(delay, retry_after)
+            self.delay = min(self.max_delay, delay)
+            self._next_call = max(self._next_call, monotonic() + self.delay)
+
+    def call(self, function: Callable[..., _T], *args, **kwargs) -> _T:
+        retries = self.retries
+        while True:
+            self.wait()
+            try:
+                result = function(*args, **kwargs)
+            except Exception as e:
+                if not _is_retryable(e) or retries <= 0:
+                    raise e
+                self.failure(_retry_after(e))
+                print(
+                    f"Rate limited ({e}). Re-trying in {self.delay:.1f}s. {retries} retries left."
+                )
+                retries -= 1
+                continue
+            self.success()
+            return result
+
+    def call_once(self, function: Callable[..., _T], *args, **kwargs) -> _T:
+        """
+        Call without re-trying, for calls that are not idempotent. A failure still slows down the following calls.
+        """
+        self.wait()
+        try:
+            result = function(*args, **kwargs)
+        except Exception as e:
+            if _is_retryable(e):
+                self.failure(_retry_after(e))
+            raise e
+        self.success()
+        return result
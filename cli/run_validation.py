@@ -0,0 +1,140 @@
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Any, Collection, Sequence
+
+from pandas import DataFrame, Series, concat, read_csv, read_xml, to_numeric
+from pandas.errors import EmptyDataError, ParserError
+
+# Number of lines parsed at once, to bound the memory for huge runs.
+_CHUNK_SIZE = 100000
+# Number of offending lines or values quoted per problem.
+_EXAMPLES = 3
+_COLUMNS = ["qid", "q0", "docno", "rank", "score", "system"]
+
+
+def read_topic_ids(topics_path: Path) -> set[str]:
+    if topics_path.suffix == ".xml":
+        topics = read_xml(topics_path, dtype=str)
+        column = next(i for i in ("number", "num", "qid", "id") if i in topics.columns)
+    else:
+        topics = read_csv(topics_path, dtype=str)
+        column = "qid"
+    return set(topics[column].str.strip())
+
+
+def _examples(values: Series) -> str:
+    return ", ".join(str(i) for i in values.head(_EXAMPLES))
+
+
+def _read_lines(path: Path) -> tuple[DataFrame, int, list[str]]:
+    # Read each line as a whole and split it with vectorized string operations, so that malformed lines do not abort parsing.
+    errors = []
+    frames = []
+    num_lines = 0
+    chunks = read_csv(
+        path,
+        sep="\x1f",
+        header=None,
+        names=["line"],
+        dtype=str,
+        quoting=3,
+        # Blank lines are read (as missing values) so that the index is the line number, but they are skipped.
+        skip_blank_lines=False,
+        chunksize=_CHUNK_SIZE,
+    )
+    for chunk in chunks:
+        lines = chunk["line"].fillna("")
+        num_columns = lines.str.count(r"\S+")
+        blank = num_columns == 0
+        wrong = (num_columns != 6) & ~blank
+        if wrong.any():
+            line_numbers = Series(chunk.index[wrong.to_numpy()] + 1)
+            errors.append(f"{wrong.sum()} lines without 6 columns (e.g., line {_examples(line_numbers)})")
+        fields = lines[~wrong & ~blank].str.split(expand=True)
+        if len(fields) > 0:
+            fields.columns = _COLUMNS
+            frames.append(fields)
+        num_lines += int((~blank).sum())
+    run = concat(frames, ignore_index=True) if len(frames) > 0 else DataFrame(columns=_COLUMNS)
+    return run, num_lines, errors
+
+
+def validate_run(path: Path, topic_ids: Collection[str] | None = None) -> dict[str, Any]:
+    """
+    Check a (gzipped) TREC run file for lines without exactly six columns, non-numeric ranks or scores,
+    duplicate documents per topic, ranks that contradict the scores, and unknown or missing topics.
+    """
+    warnings = []
+    try:
+        # Well-formed files are parsed at once, the others line by line.
+        run = read_csv(
+            path,
+            sep=r"\s+",
+            header=None,
+            names=_COLUMNS,
+            dtype={"qid": str, "q0": str, "docno": str, "system": str},
+            quoting=3,
+        )
+        if run["system"].isna().any():
+            raise ParserError("Lines with fewer than 6 columns.")
+        num_lines, errors = len(run), []
+    except ParserError:
+        run, num_lines, errors = _read_lines(path)
+    except EmptyDataError:
+        run, num_lines, errors = DataFrame(columns=_COLUMNS), 0, []
+
+    if len(run) == 0:
+        errors.append("no valid lines")
+    else:
+        for column in ("rank", "score"):
+            values = to_numeric(run[column], errors="coerce")
+            if values.isna().any():
+                errors.append(f"{values.isna().sum()} non-numeric {column}s (e.g., {_examples(run.loc[values.isna(), column])})")
+            run[column] = values
+        run = run.dropna(subset=["rank", "score"])
+
+        duplicates = run.duplicated(["qid", "docno"])
+        if duplicates.any():
+            pairs = run.loc[duplicates, "qid"] + "/" + run.loc[duplicates, "docno"]
+            errors.append(f"{duplicates.sum()} duplicate documents per topic (e.g., {_examples(pairs)})")
+
+        # Within a topic, the scores must not increase with the rank.
+        ordered = run.sort_values(["qid", "rank"], kind="stable")
+        increases = (ordered.groupby("qid")["score"].diff() > 0) | ordered.duplicated(["qid", "rank"])
+        if increases.any():
+            topics = ordered.loc[increases, "qid"].drop_duplicates()
+            errors.append(f"ranks contradict the scores in {len(topics)} topics (e.g., {_examples(topics)})")
+
+        if topic_ids is not None:
+            unknown = run.loc[~run["qid"].isin(topic_ids), "qid"].drop_duplicates()
+            if len(unknown) > 0:
+                errors.append(f"{len(unknown)} unknown topics (e.g., {_examples(unknown)})")
+            missing = sorted(set(topic_ids) - set(run["qid"].unique()))
+            if len(missing) > 0:
+                warnings.append(f"no results for {len(missing)} topics (e.g., {', '.join(missing[:_EXAMPLES])})")
+
+        systems = run["system"].drop_duplicates()
+        if len(systems) > 1:
+            warnings.append(f"{len(systems)} different run tags (e.g., {_examples(systems)})")
+
+    return {
+        "run": path.name,
+        "path": str(path),
+        "valid": len(errors) == 0,
+        "lines": num_lines,
+        "topics": run["qid"].nunique(),
+        "errors": "; ".join(errors),
+        "warnings": "; ".join(warnings),
+    }
+
+
+def validate_runs(run_paths: Sequence[Path], topic_ids: Collection[str] | None = None, jobs: int | None = None) -> DataFrame:
+    """
+    Validate the runs in parallel processes and summarize the problems of each run in one row.
+    """
+    with ProcessPoolExecutor(max_workers=jobs, mp_context=get_context("spawn")) as executor:
+        rows = list(executor.map(partial(validate_run, topic_ids=topic_ids), run_paths, chunksize=8))
+    columns = ["run", "path", "valid", "lines", "topics", "errors", "warnings"]
+    return DataFrame(rows, columns=columns).sort_values(["valid", "run"]).reset_index(drop=True)
@@ -0,0 +1,100 @@
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from json import dumps, loads
+from pathlib import Path
+from time import time
+from typing import Callable, Collection
+
+
+class StageScheduler:
+    """
+    Run the stages of a pipeline as a DAG: each stage starts as soon as all its dependencies are done.
+    Stages either use the network ("io") or the CPU ("cpu"), with separate limits on how many of each run at the same time.
+    The status and duration of each stage is saved to a state file, either the scheduler's or the stage's own
+    (e.g., one per course directory when several courses share the scheduler).
+    Stages are expected to skip work that is already done (e.g., by the build manifest), so a failed pipeline resumes where it stopped.
+    """
+
+    def __init__(self, jobs: int = 1, io_jobs: int = 4, state_path: Path | None = None) -> None:
+        self.limits = {"cpu": max(jobs, 1), "io": max(io_jobs, 1)}
+        self.state_path = state_path
+        self._stages: dict[str, tuple[Callable[[], None], tuple[str, ...], str]] = {}
+        # The state file and the name in the file of each stage, and the states per file.
+        self._state_keys: dict[str, tuple[Path | None, str]] = {}
+        self._states: dict[Path | None, dict[str, dict]] = {}
+
+    def add(
+        self,
+        name: str,
+        run: Callable[[], None],
+        dependencies: Collection[str] = (),
+        resource: str = "cpu",
+        state_path: Path | None = None,
+        state_name: str | None = None,
+    ) -> str:
+        if name in self._stages:
+            raise ValueError(f"Duplicate stage '{name}'.")
+        if resource not in self.limits:
+            raise ValueError(f"Unknown resource '{resource}'.")
+        missing = [i for i in dependencies if i not in self._stages]
+        if len(missing) > 0:
+            # Dependencies must be added first, which also rules out cycles.
+            raise ValueError(f"Stage '{name}' depends on unknown stages: {', '.join(missing)}.")
+        self._stages[name] = (run, tuple(dependencies), resource)
+        state_path = state_path or self.state_path
+        self._state_keys[name] = (state_path, state_name or name)
+        if state_path not in self._states:
+            self._states[state_path] = loads(state_path.read_text()) if state_path is not None and state_path.exists() else {}
+        return name
+
+    def _set_state(self, name: str, state: dict) -> None:
+        state_path, key = self._state_keys[name]
+        self._states[state_path][key] = state
+
+    def _save(self) -> None:
+        for state_path, state in self._states.items():
+            if state_path is not None:
+                state_path.write_text(dumps(state, indent=2, sort_keys=True))
+
+    def _run_stage(self, name: str) -> None:
+        start = time()
+        self._stages[name][0]()
+        self._set_state(name, {"status": "done", "seconds": round(time() - start, 3)})
+
+    def run(self) -> None:
+        done: set[str] = set()
+        running: dict[Future, str] = {}
+        pending = list(self._stages.keys())
+        active = {resource: 0 for resource in self.limits}
+        failure: BaseException | None = None
+
+        with ThreadPoolExecutor(max_workers=sum(self.limits.values())) as executor:
+            while len(pending) > 0 or len(running) > 0:
+                if failure is None:
+                    for name in list(pending):
+                        _, dependencies, resource = self._stages[name]
+                        if active[resource] < self.limits[resource] and all(i in done for i in dependencies):
+                            pending.remove(name)
+                            active[resource] += 1
+                            self._set_state(name, {"status": "running"})
+                            running[executor.submit(self._run_stage, name)] = name
+                elif len(running) == 0:
+                    break
+                self._save()
+
+                finished, _ = wait(running.keys(), return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name = running.pop(future)
+                    active[self._stages[name][2]] -= 1
+                    error = future.exception()
+                    if error is not None:
+                        self._set_state(name, {"status": "failed", "error": repr(error)})
+                        print(f"Stage {name} failed: {error!r}")
+                        failure = failure or error
+                    else:
+                        done.add(name)
+            for name in pending:
+                self._set_state(name, {"status": "pending"})
+            self._save()
+
+        if failure is not None:
+            raise failure
@@ -0,0 +1,141 @@
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations
+from math import ceil
+from multiprocessing import get_context
+from os import cpu_count
+
+from numpy import (
+    absolute,
+    arange,
+    argsort,
+    array,
+    array_split,
+    concatenate,
+    empty_like,
+    full,
+    maximum,
+    minimum,
+    nan,
+    ndarray,
+    percentile,
+    zeros,
+)
+from numpy.random import default_rng
+from pandas import DataFrame
+
+# Number of trials and pairs evaluated at once, to bound the memory of the (pairs x trials) matrices.
+_BLOCK_SIZE = 1000
+_MAX_PAIRS_PER_CHUNK = 500
+
+
+def _test_pairs(
+    differences: ndarray,
+    trials: int,
+    seed: int,
+    confidence: float,
+) -> tuple[ndarray, ndarray, ndarray]:
+    """
+    Paired two-sided randomization test and bootstrap confidence interval of the mean difference for each row of topic differences.
+    All pairs share the same random sign flips and resamples (derived from the seed),
+    so the results do not depend on how the pairs are split across processes.
+    """
+    num_topics = differences.shape[1]
+    observed = absolute(differences.mean(axis=1))
+
+    rng = default_rng([seed, 0])
+    exceeding = zeros(len(differences))
+    for start in range(0, trials, _BLOCK_SIZE):
+        signs = rng.choice([-1.0, 1.0], size=(min(_BLOCK_SIZE, trials - start), num_topics))
+        permuted = absolute(differences @ signs.T / num_topics)
+        exceeding += (permuted >= observed[:, None] - 1e-12).sum(axis=1)
+    p_values = (exceeding + 1) / (trials + 1)
+
+    rng = default_rng([seed, 1])
+    weights = rng.multinomial(num_topics, full(num_topics, 1 / num_topics), size=trials)
+    bootstrap_means = differences @ weights.T / num_topics
+    low, high = percentile(
+        bootstrap_means,
+        [(1 - confidence) / 2 * 100, (1 + confidence) / 2 * 100],
+        axis=1,
+    )
+    return p_values, low, high
+
+
+def correct_p_values(p_values: ndarray, method: str) -> ndarray:
+    n = len(p_values)
+    if method == "none" or n == 0:
+        return p_values
+    if method == "bonferroni":
+        return minimum(p_values * n, 1)
+
+    order = argsort(p_values)
+    sorted_p_values = p_values[order]
+    if method == "holm":
+        adjusted = maximum.accumulate((n - arange(n)) * sorted_p_values)
+    elif method == "fdr_bh":
+        adjusted = minimum.accumulate((sorted_p_values * n / (arange(n) + 1))[::-1])[::-1]
+    else:
+        raise ValueError(f"Unknown correction method '{method}'.")
+
+    ret = empty_like(p_values)
+    ret[order] = minimum(adjusted, 1)
+    return ret
+
+
+def significance_tests(
+    scores: DataFrame,
+    trials: int = 10000,
+    seed: int = 0,
+    confidence: float = 0.95,
+    correction: str = "holm",
+    jobs: int | None = None,
+) -> tuple[DataFrame, DataFrame]:
+    """
+    Test all pairs of runs in a (runs x topics) score matrix for significant differences.
+    Return the corrected p-values as a (runs x runs) matrix and the details of each pair.
+    """
+    scores = scores.loc[scores.mean(axis=1).sort_values(ascending=False).index]
+    runs = list(scores.index)
+    values = scores.to_numpy(dtype=float)
+    pairs = list(combinations(range(len(runs)), 2))
+    if len(pairs) == 0:
+        raise ValueError("Need at least two runs to test for significance.")
+    first = array([i for i, _ in pairs])
+    second = array([j for _, j in pairs])
+    differences = values[first] - values[second]
+
+    num_chunks = max(jobs or cpu_count() or 1, ceil(len(pairs) / _MAX_PAIRS_PER_CHUNK))
+    chunks = [i for i in array_split(differences, min(num_chunks, len(pairs))) if len(i) > 0]
+    with ProcessPoolExecutor(max_workers=jobs, mp_context=get_context("spawn")) as executor:
+        results = list(
+            executor.map(
+                _test_pairs,
+                chunks,
+                [trials] * len(chunks),
+                [seed] * len(chunks),
+                [confidence] * len(chunks),
+            )
+        )
+    p_values = concatenate([i[0] for i in results])
+    low = concatenate([i[1] for i in results])
+    high = concatenate([i[2] for i in results])
+    corrected = correct_p_values(p_values, correction)
+
+    details = DataFrame(
+        {
+            "run_a": [runs[i] for i in first],
+            "run_b": [runs[j] for j in second],
+            "mean_difference": differences.mean(axis=1),
+            "ci_low": low,
+            "ci_high": high,
+            "p_value": p_values,
+            "p_value_corrected": corrected,
+        }
+    )
+
+    matrix = DataFrame(nan, index=runs, columns=runs)
+    matrix.index.name = "run"
+    for i, j, p in zip(first, second, corrected):
+        matrix.iat[i, j] = p
+        matrix.iat[j, i] = p
+    return matrix, details
@@ -0,0 +1,297 @@
+from collections import Counter
+from functools import cache, lru_cache
+from importlib.resources import files
+from json import dumps, loads
+from pathlib import Path
+from re import compile as re_compile
+from typing import Callable, Iterable
+
+from numpy import (
+    arange,
+    array,
+    asarray,
+    diff,
+    errstate,
+    int32,
+    lexsort,
+    log2,
+    ndarray,
+    ones_like,
+    pi,
+    repeat,
+    where,
+    zeros,
+)
+from nltk.stem.porter import PorterStemmer
+from pandas import DataFrame
+from scipy.sparse import csc_matrix, csr_matrix, load_npz, save_npz
+
+# Tokenization rules of Terrier's EnglishTokeniser.
+_TOKEN_PATTERN = re_compile(r"[a-z0-9]+")
+_REPEATED_CHARACTERS_PATTERN = re_compile(r"(.)\1{3}")
+_MAX_TERM_LENGTH = 20
+_MAX_DIGITS = 4
+
+_REC_LOG_2_OF_E = 1 / log2(2.718281828459045)
+
+# Martin Porter's reference implementation, which Terrier's PorterStemmer follows as well.
+_STEMMER = PorterStemmer(mode=PorterStemmer.MARTIN_EXTENSIONS)
+
+
+@cache
+def _stopwords() -> frozenset[str]:
+    return frozenset(files("cli").joinpath("stopwords.txt").read_text().split())
+
+
+@lru_cache(maxsize=1_000_000)
+def _term(token: str) -> str | None:
+    if (
+        len(token) > _MAX_TERM_LENGTH
+        or sum(c.isdigit() for c in token) > _MAX_DIGITS
+        or _REPEATED_CHARACTERS_PATTERN.search(token) is not None
+        or token in _stopwords()
+    ):
+        return None
+    return _STEMMER.stem(token, to_lowercase=False)
+
+
+def analyze(text: str) -> list[str]:
+    """
+    Tokenize, remove stopwords, and stem a text like Terrier's default term pipeline.
+    """
+    terms = (_term(token) for token in _TOKEN_PATTERN.findall(text.lower()))
+    return [term for term in terms if term is not None]
+
+
+# Weighting models, computed for all (document, term) postings at once from the term frequencies (tf),
+# document lengths (dl), document frequencies (df), and collection frequencies (cf) of the postings.
+# The formulas follow the implementations in Terrier (using log base 2).
+_Statistics = dict[str, float]
+_WeightingModel = Callable[..., ndarray]
+
+
+def _bm25(tf, dl, df, cf, s: _Statistics, k_1=1.2, b=0.75):
+    k = k_1 * ((1 - b) + b * dl / s["avgdl"])
+    return log2((s["N"] - df + 0.5) / (df + 0.5)) * ((k_1 + 1) * tf / (k + tf))
+
+
+def _tf_idf(tf, dl, df, cf, s: _Statistics, k_1=1.2, b=0.75):
+    robertson_tf = k_1 * tf / (tf + k_1 * (1 - b + b * dl / s["avgdl"]))
+    return robertson_tf * log2(s["N"] / df + 1)
+
+
+def _pl2(tf, dl, df, cf, s: _Statistics, c=1.0):
+    tfn = tf * log2(1 + c * s["avgdl"] / dl)
+    f = cf / s["N"]
+    return (
+        tfn * log2(1 / f) + f * _REC_LOG_2_OF_E + 0.5 * log2(2 * pi * tfn) + tfn * (log2(tfn) - _REC_LOG_2_OF_E)
+    ) / (tfn + 1)
+
+
+def _dirichlet_lm(tf, dl, df, cf, s: _Statistics, mu=2500.0):
+    return log2(1 + tf / (mu * cf / s["tokens"])) + log2(mu / (dl + mu))
+
+
+def _hiemstra_lm(tf, dl, df, cf, s: _Statistics, c=0.15):
+    return log2(1 + c * tf * s["tokens"] / ((1 - c) * cf * dl))
+
+
+def _dfree(tf, dl, df, cf, s: _Statistics):
+    prior = tf / dl
+    posterior = (tf + 1) / (dl + 1)
+    inverse_prior_collection = s["tokens"] / cf
+    norm = tf * log2(posterior / prior)
+    return norm * (
+        tf * -log2(prior * inverse_prior_collection)
+        + (tf + 1) * log2(posterior * inverse_prior_collection)
+        + 0.5 * log2(posterior / prior)
+    )
+
+
+def _dl(tf, dl, df, cf, s: _Statistics):
+    return dl.astype(float)
+
+
+def _tf(tf, dl, df, cf, s: _Statistics):
+    return tf.astype(float)
+
+
+def _dlh(tf, dl, df, cf, s: _Statistics, k=0.5):
+    f = tf / dl
+    # Documents consisting only of the term would get an infinite penalty, score them 0 instead.
+    with errstate(divide="ignore", invalid="ignore"):
+        scores = (tf * log2(tf * s["avgdl"] / dl * s["N"] / cf) + 0.5 * log2(2 * pi * tf * (1 - f))) / (tf + k)
+    return where(f < 1, scores, 0)
+
+
+def _dph(tf, dl, df, cf, s: _Statistics):
+    f = tf / dl
+    norm = (1 - f) * (1 - f) / (tf + 1)
+    with errstate(divide="ignore", invalid="ignore"):
+        scores = norm * (tf * log2(tf * s["avgdl"] / dl * s["N"] / cf) + 0.5 * log2(2 * pi * tf * (1 - f)))
+    return where(f < 1, scores, 0)
+
+
+def _lgd(tf, dl, df, cf, s: _Statistics, c=1.0):
+    tfn = tf * log2(1 + c * s["avgdl"] / dl)
+    freq = df / s["N"]
+    return log2((freq + tfn) / freq)
+
+
+WEIGHTING_MODELS: dict[str, _WeightingModel] = {
+    "BM25": _bm25,
+    "PL2": _pl2,
+    "TF_IDF": _tf_idf,
+    "DirichletLM": _dirichlet_lm,
+    "Hiemstra_LM": _hiemstra_lm,
+    "DFRee": _dfree,
+    "Dl": _dl,
+    "DLH": _dlh,
+    "DPH": _dph,
+    "Tf": _tf,
+    "LGD": _lgd,
+}
+
+
+def query_term_weights(wmodel: str, key_frequencies, k_3=8.0):
+    """
+    Weight of the query terms given their frequency in the query (Terrier's key frequency).
+    """
+    if wmodel == "BM25":
+        return (k_3 + 1) * key_frequencies / (k_3 + key_frequencies)
+    return key_frequencies
+
+
+class SparseIndex:
+    """
+    In-memory index of a small corpus as a sparse (documents x terms) matrix of term frequencies.
+    Retrieval scores all topics in one batch with vectorized weighting models, without starting a JVM.
+    """
+
+    def __init__(self, docnos: list[str], terms: list[str], matrix: csc_matrix) -> None:
+        self.docnos = array(docnos, dtype=object)
+        self.terms = terms
+        self.vocabulary = {term: i for i, term in enumerate(terms)}
+        self.matrix = matrix
+        self.document_lengths = asarray(matrix.sum(axis=1)).ravel()
+        self.document_frequencies = diff(matrix.indptr)
+        self.collection_frequencies = asarray(matrix.sum(axis=0)).ravel()
+        tokens = float(self.document_lengths.sum())
+        num_documents = len(docnos)
+        self.statistics: _Statistics = {
+            "N": num_documents,
+            "tokens": tokens,
+            "avgdl": tokens / num_documents if num_documents > 0 else 0.0,
+        }
+
+    @classmethod
+    def build(cls, documents: Iterable[dict], field: str = "text") -> "SparseIndex":
+        docnos = []
+        vocabulary: dict[str, int] = {}
+        indptr = [0]
+        indices = []
+        data = []
+        for document in documents:
+            counts = Counter(analyze(document.get(field) or ""))
+            docnos.append(str(document["docno"]))
+            for term, count in counts.items():
+                indices.append(vocabulary.setdefault(term, len(vocabulary)))
+                data.append(count)
+            indptr.append(len(indices))
+        matrix = csr_matrix(
+            (array(data, dtype=int32), array(indices, dtype=int32), array(indptr)),
+            shape=(len(docnos), len(vocabulary)),
+        )
+        return cls(docnos, list(vocabulary.keys()), matrix.tocsc())
+
+    def save(self, path: Path) -> None:
+        path.mkdir(parents=True, exist_ok=True)
+        save_npz(path / "matrix.npz", self.matrix)
+        (path / "docnos.json").write_text(dumps(list(self.docnos)))
+        (path / "terms.json").write_text(dumps(self.terms))
+
+    @classmethod
+    def load(cls, path: Path) -> "SparseIndex":
+        return cls(
+            loads((path / "docnos.json").read_text()),
+            loads((path / "terms.json").read_text()),
+            load_npz(path / "matrix.npz").tocsc(),
+        )
+
+    def weight_matrix(self, wmodel: str = "BM25") -> csc_matrix:
+        """
+        Weights of all (document, term) postings under the weighting model, e.g., to score documents as queries.
+        """
+        posting_terms = repeat(arange(len(self.terms)), diff(self.matrix.indptr))
+        with errstate(divide="ignore"):
+            weights = WEIGHTING_MODELS[wmodel](
+                self.matrix.data.astype(float),
+                self.document_lengths[self.matrix.indices].astype(float),
+                self.document_frequencies[posting_terms].astype(float),
+                self.collection_frequencies[posting_terms].astype(float),
+                self.statistics,
+            )
+        return csc_matrix((weights, self.matrix.indices, self.matrix.indptr), shape=self.matrix.shape)
+
+    def retrieve(self, topics: DataFrame, wmodel: str, depth: int) -> DataFrame:
+        """
+        Retrieve the top documents for all topics (with the columns qid and query) at once.
+        Documents matching a query term are ranked by descending score (ties by index order), like in Terrier.
+        """
+        columns = ["qid", "docid", "docno", "rank", "score", "query"]
+        model = WEIGHTING_MODELS[wmodel]
+        queries = [
+            Counter(term for term in analyze(str(query)) if term in self.vocabulary)
+            for query in topics["query"]
+        ]
+        term_ids = sorted({self.vocabulary[term] for query in queries for term in query})
+        if len(term_ids) == 0:
+            return DataFrame(columns=columns)
+
+        positions = {term_id: i for i, term_id in enumerate(term_ids)}
+        key_frequencies = zeros((len(term_ids), len(queries)))
+        for j, query in enumerate(queries):
+            for term, count in query.items():
+                key_frequencies[positions[self.vocabulary[term]], j] = count
+
+        # Weight all postings of the query terms at once.
+        postings = self.matrix[:, term_ids]
+        posting_terms = array(term_ids)[repeat(arange(len(term_ids)), diff(postings.indptr))]
+        with errstate(divide="ignore"):
+            weights = model(
+                postings.data.astype(float),
+                self.document_lengths[postings.indices].astype(float),
+                self.document_frequencies[posting_terms].astype(float),
+                self.collection_frequencies[posting_terms].astype(float),
+                self.statistics,
+            )
+        weights = csc_matrix((weights, postings.indices, postings.indptr), shape=postings.shape)
+        query_weights = csr_matrix(query_term_weights(wmodel, key_frequencies))
+
+        # Sparse products drop zero scores, so the matching documents are determined separately.
+        scores = (weights @ query_weights).tocsr()
+        postings_matched = csc_matrix((ones_like(postings.data), postings.indices, postings.indptr), shape=postings.shape)
+        matches = (postings_matched @ csr_matrix(key_frequencies > 0, dtype=int32)).tocoo()
+        documents = matches.row
+        query_ids = matches.col
+        values = asarray(scores[documents, query_ids]).ravel()
+
+        order = lexsort((documents, -values, query_ids))
+        documents = documents[order]
+        query_ids = query_ids[order]
+        values = values[order]
+        group_starts = where(diff(query_ids, prepend=-1) != 0)[0]
+        ranks = arange(len(query_ids)) - repeat(group_starts, diff(group_starts, append=len(query_ids)))
+        top = ranks < depth
+
+        return DataFrame(
+            {
+                "qid": topics["qid"].to_numpy()[query_ids[top]],
+                "docid": documents[top],
+                "docno": self.docnos[documents[top]],
+                "rank": ranks[top],
+                "score": values[top],
+                "query": topics["query"].to_numpy()[query_ids[top]],
+            },
+            columns=columns,
+        )
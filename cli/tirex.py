@@ -1,66 +1,99 @@
 import json
-import time
+from functools import cache, partial
 from glob import glob
 from gzip import open as gzip_open
 from itertools import chain
 from json import dump, dumps, load, loads
-from os import environ
 from pathlib import Path
+from queue import Empty, Queue
 from pandas import read_xml
 from statistics import mean, median
-from typing import Collection, Iterator
-import gzip
+from threading import Lock, Thread
+from typing import Any, Callable, Collection, Iterator, Sequence
 
 from chatnoir_api.model import Index
-from chatnoir_api import cache_contents
 from ir_datasets import load as irds_load
 from pandas import DataFrame, read_csv
 from pyterrier import BatchRetrieve, IndexFactory, IterDictIndexer, Transformer, IndexFactory
 from pyterrier.terrier import Retriever as pt_retriever
 from pyterrier.apply import generic
 from pyterrier.io import read_results, read_topics, write_results
-from chatnoir_pyterrier import ChatNoirRetrieve, Feature
+from pyterrier_caching import Lazy, ScorerCache
 from tira.rest_api_client import Client
 from tqdm import tqdm
 from trectools import TrecPoolMaker, TrecRun, TrecQrel
 
+from cli.caching import DocumentCache, RetrievalCache
+from cli.chatnoir import ChatNoirQueryExecutor
+from cli.corpus_graph import CorpusGraph
+from cli.documents import DocumentStore, OffsetDocumentStore
+from cli.manifest import BuildManifest, file_sha256
+from cli.near_duplicates import collapse_pool, find_near_duplicates
+from cli.passages import PassageIdResolver
+from cli.pooling import make_pool
+from cli.scheduler import StageScheduler
+from cli.sparse_retrieval import SparseIndex
+from cli.rate_limit import AdaptiveRateLimiter, FailedResponse
+
+
+@cache
+def _passage_id_resolver() -> PassageIdResolver:
+    # One resolver (i.e., one HTTP session and cache connection) per process.
+    return PassageIdResolver()
+
 
 def _fetch_passage_ids(doc_id: str) -> list[str]:
-    from elasticsearch_dsl import Search, connections
-    from elasticsearch_dsl.query import Prefix
+    return fetch_passage_ids([doc_id])[doc_id]
 
-    try:
-        connections.get_connection()
-    except KeyError:
-        # FIXME: The Elasticsearch connection should not be hardcoded.
-        connections.configure(
-            default={
-                "hosts": ["https://elasticsearch.srv.webis.de:9200"],
-                "retry_on_timeout": True,
-                "http_auth": (environ["ES_USER"], environ["ES_PASSWORD"]),
-                "timeout": 30,
-            }
-        )
 
-    # FIXME: The Elasticsearch index should not be hardcoded.
-    results = (
-        Search()
-        .index("chatnoir_meta_complete_msmarco_document_v2.1_segmented")
-        .query(Prefix(warc_trec_id=f"{doc_id}#"))
-    )
-    ids = {result.warc_trec_id for result in results}
-    return sorted(ids)
+def fetch_passage_ids(doc_ids: Collection[str], resolver: PassageIdResolver | None = None) -> dict[str, list[str]]:
+    if resolver is None:
+        resolver = _passage_id_resolver()
+    return resolver.resolve(doc_ids)
 
 
-def _iter_re_rankers() -> Iterator[tuple[str, Transformer]]:
-    try:
-        from pyterrier_dr import Ance, TctColBert
-        from pyterrier_t5 import MonoT5ReRanker
-    except:
-        pass
-    yield "mono-t5", lambda: MonoT5ReRanker(verbose=True)
-    yield "colbert", lambda: TctColBert(verbose=True)
-    yield "ance", lambda: Ance(verbose=True)
+# File name prefixes of the runs retrieved from the course's own index, per retrieval backend.
+_RUN_PREFIXES = {"terrier": "run-pt-", "sparse": "run-sparse-"}
+
+# Number of neighbours per document stored in the corpus graph.
+_CORPUS_GRAPH_K = 16
+
+# Batch sizes tuned for re-ranking on CPU.
+_RE_RANKER_BATCH_SIZES = {"mono-t5": 16, "colbert": 64, "ance": 64}
+
+
+# Loaded re-rankers, shared by all courses pooled in the same process.
+_re_rankers: dict[str, Transformer] = {}
+_re_rankers_lock = Lock()
+
+
+def _load_re_ranker(name: str) -> Transformer:
+    with _re_rankers_lock:
+        if name not in _re_rankers:
+            from pyterrier_dr import Ance, TctColBert
+            from pyterrier_t5 import MonoT5ReRanker
+
+            factories = {"mono-t5": MonoT5ReRanker, "colbert": TctColBert, "ance": Ance}
+            _re_rankers[name] = factories[name](batch_size=_RE_RANKER_BATCH_SIZES[name], verbose=True)
+        return _re_rankers[name]
+
+
+def _iter_re_rankers() -> Iterator[tuple[str, Callable[[], Transformer]]]:
+    for name in _RE_RANKER_BATCH_SIZES:
+        yield name, partial(_load_re_ranker, name)
+
+
+def _is_up_to_date(target: Path, manifest: BuildManifest | None, inputs: list[Path], params: dict) -> bool:
+    # Without a manifest, artifacts are only rebuilt if they do not exist.
+    if manifest is None:
+        return target.exists()
+    return manifest.is_fresh(target, inputs, params)
+
+
+def _record(target: Path, manifest: BuildManifest | None, inputs: list[Path], params: dict, slot: str | None = None):
+    # Runs recorded for a slot replace the slot's earlier run, so that runs of old parameters are not pooled.
+    if manifest is not None:
+        manifest.record(target, inputs, params, slot)
 
 
 def topic_to_relevant_docs(p):
@@ -80,39 +113,77 @@ def topic_to_relevant_docs(p):
 def get_judgment_pool(
     pooling_path: Path,
     pooling_depth,
+    strategy: str = "topX",
+    budget: int | None = None,
+    manifest: BuildManifest | None = None,
+    graph_expansion: int = 0,
 ):
     output_path = pooling_path / "judgment-pool.json"
-    if not output_path.exists():
-        config_data = json.load(open(pooling_path / "config.json"))
+    config_data = json.load(open(pooling_path / "config.json"))
+    inputs = [pooling_path / config_data["topics"], pooling_path / "manual.csv", pooling_path / config_data["runs"]]
+    params = {"depth": pooling_depth, "strategy": strategy, "budget": budget, "order": "rrf", "graph_expansion": graph_expansion}
+    if graph_expansion > 0:
+        inputs.append(pooling_path / "corpus-graph")
+    if not _is_up_to_date(output_path, manifest, inputs, params):
         relevant_documents_per_topic = topic_to_relevant_docs(pooling_path)
+        relevant_documents = {
+            str(t.qid): set(str(t.doc_id).split(","))
+            for _, t in relevant_documents_per_topic.iterrows()
+        }
 
         runs = []
         for run in glob(str(pooling_path) +"/" + config_data["runs"] + "/*.gz"):
             runs += [TrecRun(run)]
 
-        print(f"pool {len(runs)} runs.")
-        pool = TrecPoolMaker().make_pool(runs, strategy="topX", topX=pooling_depth).pool
+        print(f"pool {len(runs)} runs with strategy {strategy}.")
+        if len(runs) == 0:
+            print(f"No runs in {pooling_path / config_data['runs']}, the pool only contains the known relevant documents.")
+        pool, recall = make_pool(runs, strategy, pooling_depth, budget, relevant_documents)
+        if len(recall) > 0:
+            print(
+                "Estimated recall",
+                mean(recall.values()),
+                "(Mean)",
+                ";",
+                min(recall.values()),
+                "(Min).",
+            )
         pool_sizes = []
         for k in pool:
             pool_sizes += [len(pool[k])]
 
-        print(
-            "Pool sizes",
-            mean(pool_sizes),
-            "(Mean)",
-            ";",
-            median(pool_sizes),
-            "(Median).",
-        )
-
+        if len(pool_sizes) > 0:
+            print(
+                "Pool sizes",
+                mean(pool_sizes),
+                "(Mean)",
+                ";",
+                median(pool_sizes),
+                "(Median).",
+            )
+
+        # The documents are ordered by their fused priority, the expansion documents come last.
         for _, t in tqdm(
             list(relevant_documents_per_topic.iterrows()), "Expansion Docs"
         ):
             for doc_id in t.doc_id.split(","):
-                pool[str(t.qid)].add(str(doc_id))
+                if str(doc_id) not in pool.setdefault(str(t.qid), []):
+                    pool[str(t.qid)].append(str(doc_id))
+
+        if graph_expansion > 0:
+            # Neighbours of the known relevant documents in the corpus graph, without new retrieval runs.
+            corpus_graph = CorpusGraph.load(pooling_path / "corpus-graph")
+            num_expanded = 0
+            for qid, docnos in relevant_documents.items():
+                for doc_id in corpus_graph.expand(docnos, graph_expansion):
+                    if doc_id not in pool.setdefault(qid, []):
+                        pool[qid].append(doc_id)
+                        num_expanded += 1
+            print(f"Added {num_expanded} neighbours of relevant documents from the corpus graph.")
 
         with output_path.open("wb") as file:
-            file.write(dumps({k: list(v) for k, v in pool.items()}).encode("UTF-8"))
+            file.write(dumps(pool).encode("UTF-8"))
+        _record(output_path, manifest, inputs, params)
 
     with output_path.open("rb") as file:
         ret = load(file)
@@ -125,39 +196,240 @@ def get_judgment_pool(
     return ret
 
 
-def chatnoir_retrieve(field, topics_path, run_dir, index, model, depth):
+def chatnoir_retrieve(
+    field,
+    topics_path,
+    run_dir,
+    index,
+    model,
+    depth,
+    cache: RetrievalCache | None = None,
+    executor: ChatNoirQueryExecutor | None = None,
+    manifest: BuildManifest | None = None,
+):
     target_file = run_dir / f"run-chatnoir-{field}-{model}-{depth}.gz"
+    inputs = [topics_path]
+    params = {"index": index, "model": model, "field": field, "depth": depth}
 
-    if target_file.exists():
+    if _is_up_to_date(target_file, manifest, inputs, params):
         return
 
+    if executor is None:
+        executor = ChatNoirQueryExecutor()
+
+    def retrieve(topics, depth):
+        return executor.retrieve(topics, index, model, depth)
+
     topics = load_topics(topics_path=topics_path, tag=field, tokenise=False)
-    chatnoir = ChatNoirRetrieve(index=index, search_method=model, features=[], verbose=True, num_results=depth, page_size=depth)
-    run = chatnoir(topics)
+    if cache is not None:
+        run = cache.retrieve(topics, retrieve, f"chatnoir/{index}", model, field, depth)
+    else:
+        run = retrieve(topics, depth)
     run_dir.mkdir(parents=True, exist_ok=True)
     write_results(run, target_file)
+    _record(target_file, manifest, inputs, params, slot=f"run-chatnoir-{field}-{model}")
 
    
-def pyterrier_retrieve(field, topics_path, run_dir, index, wmodel, depth):
-    target_file = run_dir / f"run-pt-{field}-{wmodel}-{depth}.gz"
+def pyterrier_retrieve(
+    field,
+    topics_path,
+    run_dir,
+    index,
+    wmodel,
+    depth,
+    cache: RetrievalCache | None = None,
+    manifest: BuildManifest | None = None,
+    index_version: str | None = None,
+):
+    target_file = run_dir / f"{_RUN_PREFIXES['terrier']}{field}-{wmodel}-{depth}.gz"
+    inputs = [topics_path]
+    params = {"wmodel": wmodel, "field": field, "depth": depth, "index": index_version}
 
-    if target_file.exists():
+    if _is_up_to_date(target_file, manifest, inputs, params):
         return
 
+    def retrieve(topics, depth):
+        retriever = pt_retriever(index, wmodel=wmodel, num_results=depth, verbose=True)
+        return retriever(topics)
+
     topics = load_topics(topics_path=topics_path, tag=field, tokenise=True)
-    retriever = pt_retriever(index, wmodel=wmodel, num_results=depth, verbose=True)
-    run = retriever(topics)
+    if cache is not None:
+        # The cache is local to the course directory, which has a single PyTerrier index (per version).
+        cache_index = f"pyterrier/{index_version}" if index_version is not None else "pyterrier"
+        run = cache.retrieve(topics, retrieve, cache_index, wmodel, field, depth)
+    else:
+        run = retrieve(topics, depth)
     run_dir.mkdir(parents=True, exist_ok=True)
     write_results(run, target_file)
+    _record(target_file, manifest, inputs, params, slot=f"run-{field}-{wmodel}")
+
+
+def sparse_retrieve(
+    field,
+    topics_path,
+    run_dir,
+    index: SparseIndex,
+    wmodel,
+    depth,
+    cache: RetrievalCache | None = None,
+    manifest: BuildManifest | None = None,
+    index_version: str | None = None,
+):
+    target_file = run_dir / f"{_RUN_PREFIXES['sparse']}{field}-{wmodel}-{depth}.gz"
+    inputs = [topics_path]
+    params = {"wmodel": wmodel, "field": field, "depth": depth, "index": index_version, "backend": "sparse"}
+
+    if _is_up_to_date(target_file, manifest, inputs, params):
+        return
 
+    def retrieve(topics, depth):
+        return index.retrieve(topics, wmodel, depth)
 
-def get_documents(pooling_path: Path):
+    topics = load_topics(topics_path=topics_path, tag=field, tokenise=False)
+    if cache is not None:
+        # Cached separately from the Terrier rankings, as the text processing differs slightly.
+        cache_index = f"sparse/{index_version}" if index_version is not None else "sparse"
+        run = cache.retrieve(topics, retrieve, cache_index, wmodel, field, depth)
+    else:
+        run = retrieve(topics, depth)
+    run_dir.mkdir(parents=True, exist_ok=True)
+    write_results(run, target_file)
+    # The slot is shared with the Terrier runs, so that switching the backend replaces them.
+    _record(target_file, manifest, inputs, params, slot=f"run-{field}-{wmodel}")
+
+
+def re_rank(
+    field,
+    topics_path,
+    run_dir,
+    documents: DocumentStore,
+    cache_dir,
+    name,
+    re_ranker_factory,
+    depth,
+    manifest: BuildManifest | None = None,
+    retrieval_backend: str = "terrier",
+):
+    prefix = _RUN_PREFIXES[retrieval_backend]
+    bm25_run = run_dir / f"{prefix}{field}-BM25-1000.gz"
+    target_file = run_dir / f"{prefix}{field}-BM25-{name}-{depth}.gz"
+    inputs = [topics_path, bm25_run]
+    params = {"re_ranker": name, "field": field, "depth": depth}
+
+    if _is_up_to_date(target_file, manifest, inputs, params):
+        return
+
+    topics = load_topics(topics_path=topics_path, tag=field, tokenise=False)
+    run = read_results(str(bm25_run))
+    run = run[run["rank"] < depth]
+    run = run[["qid", "docno"]].merge(topics[["qid", "query"]], on="qid")
+
+    # Scores are cached per (query text, docno) and model, so that reruns only score new pairs
+    # and edited topics do not reuse the scores of their previous query texts.
+    # The re-ranker is loaded lazily, i.e., only if some pair is not yet cached.
+    # The texts come from the document store, as the index need not contain them.
+    cache = ScorerCache(
+        str(cache_dir / f"{name}-{field}-by-query"),
+        documents.text_loader("text") >> Lazy(re_ranker_factory),
+        group="query",
+        key="docno",
+    )
+    with cache:
+        re_ranked = cache(run)
+    write_results(re_ranked, target_file)
+    _record(target_file, manifest, inputs, params, slot=f"run-{field}-BM25-{name}")
+
+
+def re_rank_runs(
+    path: Path,
+    topics_path: Path,
+    run_dir: Path,
+    depth: int,
+    threads: int | None = None,
+    manifest: BuildManifest | None = None,
+    retrieval_backend: str = "terrier",
+):
+    if threads is not None:
+        from torch import set_num_threads
+
+        set_num_threads(threads)
+
+    documents = DocumentStore(path)
+    for name, re_ranker_factory in _iter_re_rankers():
+        for field in ["title", "description"]:
+            re_rank(
+                field,
+                topics_path,
+                run_dir,
+                documents,
+                path / "re-ranker-cache",
+                name,
+                re_ranker_factory,
+                depth,
+                manifest,
+                retrieval_backend,
+            )
+
+
+def _fetch_document(doc_id: str, chatnoir_index: str, chatnoir: ChatNoirQueryExecutor) -> dict:
+    contents = json.loads(chatnoir.cache_contents(doc_id, chatnoir_index))
+    orig = contents["original_document"]
+    return {"docno": contents["docno"], "text": contents["text"], "title": orig["title"], "url": orig["url"]}
+
+
+def _fetch_documents(
+    doc_ids: Collection[str],
+    chatnoir_index: str,
+    fetched: Queue,
+    workers: int,
+    chatnoir: ChatNoirQueryExecutor,
+) -> None:
+    pending = Queue()
+    for doc_id in doc_ids:
+        pending.put(doc_id)
+
+    def fetch():
+        # The consumer waits for one sentinel per worker, so it is sent whatever happens.
+        try:
+            while True:
+                try:
+                    doc_id = pending.get_nowait()
+                except Empty:
+                    break
+                try:
+                    fetched.put((doc_id, _fetch_document(doc_id, chatnoir_index, chatnoir), None))
+                except Exception as e:
+                    # E.g., malformed responses without the original document, reported like failed requests.
+                    fetched.put((doc_id, None, e))
+        finally:
+            fetched.put(None)
+
+    for _ in range(workers):
+        Thread(target=fetch, daemon=True).start()
+
+
+def iter_documents(
+    pooling_path: Path,
+    document_cache: DocumentCache | None = None,
+    workers: int = 4,
+    queue_size: int = 1000,
+    chatnoir: ChatNoirQueryExecutor | None = None,
+) -> Iterator[dict]:
+    """
+    Yield all documents of the course corpus while fetching the missing ones in the background.
+    Fetched documents are appended to documents.jsonl.gz as they are consumed,
+    and the bounded queue stops the fetchers when the consumer (e.g., the indexer) falls behind.
+    The documents are fetched with the (shared) ChatNoir executor, i.e., under its rate limit.
+    """
     config_data = json.load(open(pooling_path / "config.json"))
     run_path = pooling_path / config_data["runs"]
     documents_path = pooling_path / "documents.jsonl.gz"
+    chatnoir_index = config_data["chatnoir-index"]
     
     def docs_failsave():
         ret =  []
+        if not documents_path.exists():
+            return ret
         with gzip_open(documents_path, "rt") as file:
             for line in file:
                 try:
@@ -166,7 +438,8 @@ def get_documents(pooling_path: Path):
 
         return ret
 
-    covered_docs = set([str(doc["docno"]) for doc in docs_failsave()])
+    covered = docs_failsave()
+    covered_docs = set([str(doc["docno"]) for doc in covered])
 
     all_docs = set()
     for file_name in glob(f"{run_path}/*.gz"):
@@ -182,32 +455,140 @@ def get_documents(pooling_path: Path):
                 all_docs.add(doc_id)
 
     print("docs size", len(all_docs))
-    if len(all_docs) > 0:
-        with gzip_open(documents_path, "at") as file:
-            for doc in tqdm(all_docs, "Load Docs"):
-                contents = cache_contents(doc, index=config_data["chatnoir-index"])
-                contents = json.loads(contents)
-                orig = contents["original_document"]
-                file.write(dumps({"docno": contents["docno"], "text": contents["text"], "title": orig["title"], "url": orig["url"]}) + "\n")
+    if len(all_docs) == 0:
+        yield from covered
+        return
+
+    if document_cache is None:
+        document_cache = DocumentCache()
+    cached, failed = document_cache.get_many(chatnoir_index, all_docs)
+    print(f"Found {len(cached)} docs in the document cache, skip {len(failed)} docs that failed recently.")
+    to_fetch = sorted(all_docs - cached.keys() - failed)
+    if len(cached) == 0 and len(to_fetch) == 0:
+        # Only documents that failed recently are missing: do not touch documents.jsonl.gz, as appending
+        # (even nothing) to it changes its hash and thus makes all artifacts derived from it stale.
+        yield from covered
+        return
+    fetched = Queue(maxsize=queue_size)
+    fetch_workers = min(workers, len(to_fetch))
+    if chatnoir is None:
+        chatnoir = ChatNoirQueryExecutor(workers=workers)
+    _fetch_documents(to_fetch, chatnoir_index, fetched, fetch_workers, chatnoir)
+
+    # Index the documents at hand while the first documents are fetched.
+    yield from covered
+    new_failures = []
+    with gzip_open(documents_path, "at") as file:
+        for doc in sorted(cached.keys()):
+            file.write(dumps(cached[doc]) + "\n")
+            yield cached[doc]
+        with tqdm(total=len(to_fetch), desc="Load Docs") as progress:
+            finished_workers = 0
+            while finished_workers < fetch_workers:
+                item = fetched.get()
+                if item is None:
+                    finished_workers += 1
+                    continue
+                progress.update()
+                doc, contents, error = item
+                if error is not None:
+                    print(f"Could not load document {doc}: {error}")
+                    new_failures.append(doc)
+                    continue
+                document_cache.put(chatnoir_index, doc, contents)
+                file.write(dumps(contents) + "\n")
                 file.flush()
+                yield contents
+    if len(new_failures) > 0:
+        document_cache.put_failures(chatnoir_index, new_failures)
+        print(f"Failed to load {len(new_failures)} docs, retry them after {document_cache.negative_ttl / 3600:.0f} hours.")
+
+
+def get_documents(
+    pooling_path: Path,
+    document_cache: DocumentCache | None = None,
+    workers: int = 4,
+    chatnoir: ChatNoirQueryExecutor | None = None,
+):
+    return list(iter_documents(pooling_path, document_cache, workers, chatnoir=chatnoir))
 
-    return docs_failsave()
 
+def _index_inputs(pooling_path: Path) -> tuple[list[Path], dict]:
+    # The index contains the documents of all runs except the runs retrieved from the index itself.
+    config_data = json.load(open(pooling_path / "config.json"))
+    runs = sorted(
+        i for i in (pooling_path / config_data["runs"]).glob("*.gz") if not i.name.startswith(tuple(_RUN_PREFIXES.values()))
+    )
+    inputs = [pooling_path / config_data["topics"], pooling_path / "manual.csv", *runs]
+    return inputs, {"chatnoir-index": config_data.get("chatnoir-index")}
 
-def get_index(pooling_path: Path):
-    index_path = pooling_path / "pyterrier-index"
-    if not index_path.exists():
-        documents = get_documents(pooling_path)
 
+def get_index(
+    pooling_path: Path,
+    workers: int = 4,
+    index_text: bool = True,
+    manifest: BuildManifest | None = None,
+    document_cache: DocumentCache | None = None,
+    chatnoir: ChatNoirQueryExecutor | None = None,
+):
+    index_path = pooling_path / "pyterrier-index"
+    inputs, params = _index_inputs(pooling_path)
+    params["index_text"] = index_text
+    if not _is_up_to_date(index_path, manifest, inputs, params):
+        # Fetch the missing documents while indexing the documents at hand.
+        # Without the texts, the index only stores the docno and the texts are looked up in the document store.
+        meta = {"docno": 100, "text": 20480} if index_text else {"docno": 100}
         indexer = IterDictIndexer(
             str(index_path.absolute()),
-            meta={"docno": 100, "text": 20480},
+            meta=meta,
         )
-        indexer.index(tqdm(documents, "Index"))
+        indexer.index(tqdm(iter_documents(pooling_path, document_cache, workers, chatnoir=chatnoir), "Index"))
+        _record(index_path, manifest, inputs, params)
+    else:
+        get_documents(pooling_path, document_cache, workers, chatnoir)
 
     return IndexFactory.of(str(index_path.absolute()))
 
 
+def get_sparse_index(
+    pooling_path: Path,
+    workers: int = 4,
+    manifest: BuildManifest | None = None,
+    document_cache: DocumentCache | None = None,
+    chatnoir: ChatNoirQueryExecutor | None = None,
+) -> SparseIndex:
+    index_path = pooling_path / "sparse-index"
+    inputs, params = _index_inputs(pooling_path)
+    if not _is_up_to_date(index_path, manifest, inputs, params):
+        # Fetch the missing documents while indexing the documents at hand.
+        index = SparseIndex.build(tqdm(iter_documents(pooling_path, document_cache, workers, chatnoir=chatnoir), "Index"))
+        index.save(index_path)
+        _record(index_path, manifest, inputs, params)
+        return index
+    get_documents(pooling_path, document_cache, workers, chatnoir)
+    return SparseIndex.load(index_path)
+
+
+def get_corpus_graph(
+    pooling_path: Path,
+    k: int = 16,
+    manifest: BuildManifest | None = None,
+    workers: int | None = None,
+) -> CorpusGraph:
+    """
+    The k nearest neighbours of each document of the sparse index (which must exist), built in up to `workers` processes.
+    """
+    graph_path = pooling_path / "corpus-graph"
+    inputs = [pooling_path / "sparse-index"]
+    params = {"k": k}
+    if not _is_up_to_date(graph_path, manifest, inputs, params):
+        corpus_graph = CorpusGraph.build(pooling_path / "sparse-index", k, workers=workers)
+        corpus_graph.save(graph_path)
+        _record(graph_path, manifest, inputs, params)
+        return corpus_graph
+    return CorpusGraph.load(graph_path)
+
+
 def load_topics(
     topics_path: Path,
     tag: str,
@@ -245,35 +626,275 @@ def read_account_to_topics(path: Path):
             ret[i["account"]] = i["topics"]
     return ret
 
-def pool_documents(
+def add_pooling_stages(
+    scheduler: StageScheduler,
     path: Path,
     pooling_depth: int,
-):
+    re_rank_depth: int = 0,
+    threads: int | None = None,
+    chatnoir_workers: int = 4,
+    pooling_strategy: str = "topX",
+    pooling_budget: int | None = None,
+    index_text: bool = True,
+    retrieval_backend: str = "terrier",
+    near_duplicate_threshold: float | None = None,
+    prior_qrels: Sequence[Path] = (),
+    graph_expansion: int = 0,
+    chatnoir: ChatNoirQueryExecutor | None = None,
+    document_cache: DocumentCache | None = None,
+    prefix: str = "",
+    jobs: int = 1,
+) -> str:
+    """
+    Add the stages that pool the documents of a course directory to the scheduler, with names starting with the prefix.
+    Their state is saved to the pipeline-state.json of the course directory.
+    The ChatNoir executor (HTTP session and rate limit) and the document cache can be shared by several courses.
+    Stages that start processes of their own start at most `jobs` of them.
+    Returns the name of the final stage.
+    """
     config_data = json.load(open(path / "config.json"))
     topics_path = path / config_data["topics"]
     run_path = path / config_data["runs"]
 
-    chatnoir_retrieve("title", topics_path, run_path, config_data["chatnoir-index"], "bm25", 100)
-    chatnoir_retrieve("description", topics_path, run_path, config_data["chatnoir-index"], "bm25", 100)
-    chatnoir_retrieve("title", topics_path, run_path, config_data["chatnoir-index"], "default", 25)
-    chatnoir_retrieve("description", topics_path, run_path, config_data["chatnoir-index"], "default", 10)
-    get_documents(path)
-    index = get_index(path)
+    manifest = BuildManifest(path)
+    retrieval_cache = RetrievalCache(path / "retrieval-cache.sqlite")
 
-    for model in ["BM25", "PL2", "TF_IDF", "DirichletLM", "Hiemstra_LM", "DFRee", "Dl", "DLH", "DPH", "Tf", "LGD"]:
-        for field in ["title", "description"]:
-            pyterrier_retrieve(field, topics_path, run_path, index, model, 1000)
+    def add_stage(name, run, dependencies=(), resource="cpu"):
+        # The state of the stages goes to the course directory, also if several courses share the scheduler.
+        return scheduler.add(
+            f"{prefix}{name}", run, dependencies, resource, state_path=path / "pipeline-state.json", state_name=name
+        )
+
+    chatnoir_stages = [
+        add_stage(
+            f"chatnoir-{field}-{model}-{depth}",
+            partial(chatnoir_retrieve, field, topics_path, run_path, config_data["chatnoir-index"], model, depth, retrieval_cache, chatnoir, manifest),
+            resource="io",
+        )
+        for field, model, depth in [("title", "bm25", 100), ("description", "bm25", 100), ("title", "default", 25), ("description", "default", 10)]
+    ]
+
+    # The index stage hands the index to the retrieval stages.
+    indexes = {}
+
+    def build_index():
+        if retrieval_backend == "sparse":
+            # Score all topics in-process with the sparse index, without starting the JVM.
+            indexes["index"] = get_sparse_index(path, chatnoir_workers, manifest, document_cache, chatnoir)
+            indexes["version"] = manifest.artifact(path / "sparse-index")
+        else:
+            indexes["index"] = get_index(path, chatnoir_workers, index_text, manifest, document_cache, chatnoir)
+            indexes["version"] = manifest.artifact(path / "pyterrier-index")
+
+    def retrieve(field, model):
+        retrieve_fn = sparse_retrieve if retrieval_backend == "sparse" else pyterrier_retrieve
+        retrieve_fn(field, topics_path, run_path, indexes["index"], model, 1000, retrieval_cache, manifest, indexes["version"])
+
+    add_stage("index", build_index, chatnoir_stages)
+    retrieval_stages = [
+        add_stage(f"retrieve-{field}-{model}", partial(retrieve, field, model), [f"{prefix}index"])
+        for model in ["BM25", "PL2", "TF_IDF", "DirichletLM", "Hiemstra_LM", "DFRee", "Dl", "DLH", "DPH", "Tf", "LGD"]
+        for field in ["title", "description"]
+    ]
+    if re_rank_depth > 0:
+        retrieval_stages.append(
+            add_stage(
+                "re-rank",
+                partial(re_rank_runs, path, topics_path, run_path, re_rank_depth, threads, manifest, retrieval_backend),
+                [f"{prefix}retrieve-title-BM25", f"{prefix}retrieve-description-BM25"],
+            )
+        )
+
+    if graph_expansion > 0:
 
-    judgment_pool = get_judgment_pool(
-        pooling_path=path,
-        pooling_depth=pooling_depth
+        def build_corpus_graph():
+            if retrieval_backend != "sparse":
+                # The corpus graph is scored with the sparse index.
+                get_sparse_index(path, chatnoir_workers, manifest, document_cache, chatnoir)
+            get_corpus_graph(path, max(_CORPUS_GRAPH_K, graph_expansion), manifest, jobs)
+
+        retrieval_stages.append(add_stage("corpus-graph", build_corpus_graph, [f"{prefix}index"]))
+
+    def pool():
+        judgment_pool = get_judgment_pool(
+            pooling_path=path,
+            pooling_depth=pooling_depth,
+            strategy=pooling_strategy,
+            budget=pooling_budget,
+            manifest=manifest,
+            graph_expansion=graph_expansion,
+        )
+        write_doccano_judgment_pool(path, judgment_pool, manifest, near_duplicate_threshold, prior_qrels, jobs)
+
+    return add_stage("pool", pool, [*chatnoir_stages, *retrieval_stages])
+
+
+def pool_documents(
+    path: Path | Sequence[Path],
+    pooling_depth: int,
+    re_rank_depth: int = 0,
+    threads: int | None = None,
+    chatnoir_workers: int = 4,
+    chatnoir_requests_per_second: float = 4.0,
+    pooling_strategy: str = "topX",
+    pooling_budget: int | None = None,
+    index_text: bool = True,
+    retrieval_backend: str = "terrier",
+    near_duplicate_threshold: float | None = None,
+    prior_qrels: Sequence[Path] = (),
+    graph_expansion: int = 0,
+    jobs: int = 1,
+    io_jobs: int = 4,
+):
+    """
+    Pool the documents of one or several course directories.
+    All courses share one scheduler, so that the stages of different courses run in parallel within the job limits,
+    and one process (i.e., one JVM and one set of loaded re-rankers), ChatNoir executor, and document cache.
+    """
+    paths = [path] if isinstance(path, Path) else list(path)
+    chatnoir = ChatNoirQueryExecutor(
+        workers=chatnoir_workers,
+        requests_per_second=chatnoir_requests_per_second,
     )
+    document_cache = DocumentCache()
+
+    # The stages of a batch are named by their course, their state goes to the course directories.
+    scheduler = StageScheduler(jobs=jobs, io_jobs=io_jobs)
+    for course_path in paths:
+        add_pooling_stages(
+            scheduler,
+            course_path,
+            pooling_depth=pooling_depth,
+            re_rank_depth=re_rank_depth,
+            threads=threads,
+            chatnoir_workers=chatnoir_workers,
+            pooling_strategy=pooling_strategy,
+            pooling_budget=pooling_budget,
+            index_text=index_text,
+            retrieval_backend=retrieval_backend,
+            near_duplicate_threshold=near_duplicate_threshold,
+            prior_qrels=prior_qrels,
+            graph_expansion=graph_expansion,
+            chatnoir=chatnoir,
+            document_cache=document_cache,
+            prefix="" if len(paths) == 1 else f"{course_path}/",
+            jobs=jobs,
+        )
+    try:
+        scheduler.run()
+    finally:
+        document_cache.close()
+
+
+# Texts of documents to judge are truncated to this many characters.
+_MAX_TEXT_LENGTH = 7 * 1000
+
+
+def _judgment_docs_store(pooling_path: Path):
+    config_data = json.load(open(pooling_path / "config.json"))
+    if 'irds-id' in config_data:
+        return irds_load(config_data["irds-id"]).docs_store()
+    return DocumentStore(pooling_path)
+
+
+def get_near_duplicates(
+    pooling_path: Path,
+    judgment_pool,
+    threshold: float,
+    manifest: BuildManifest | None = None,
+    workers: int | None = None,
+) -> list[list[str]]:
+    output_path = pooling_path / "near-duplicates.json"
+    inputs = [pooling_path / "config.json", pooling_path / "judgment-pool.json", pooling_path / "documents.jsonl.gz"]
+    params = {"threshold": threshold, "max_length": _MAX_TEXT_LENGTH}
+    if not _is_up_to_date(output_path, manifest, inputs, params):
+        docnos = sorted({str(docno) for docnos in judgment_pool.values() for docno in docnos})
+        # The texts of the export, so that the representatives are the documents that the annotators see.
+        documents = _judgment_docs_store(pooling_path).get_many(docnos)
+        texts = {docno: document["text"] or "" for docno, document in documents.items()}
+        clusters = find_near_duplicates(texts, threshold, max_length=_MAX_TEXT_LENGTH, workers=workers)
+        print(f"Found {len(clusters)} clusters of near-duplicates with {sum(len(i) for i in clusters)} documents.")
+        with output_path.open("wt") as file:
+            dump(clusters, file)
+        _record(output_path, manifest, inputs, params)
+
+    with output_path.open("rt") as file:
+        return load(file)
+
+
+def get_prior_judgments(
+    pooling_path: Path,
+    judgment_pool,
+    prior_qrels: Sequence[Path],
+    manifest: BuildManifest | None = None,
+) -> set[tuple[str, str]]:
+    """
+    Collect the judgments of the pooled (qid, docno) pairs from earlier qrels (later files take precedence) in prior-qrels.txt.
+    Returns the judged pairs, which need not be judged again.
+    """
+    output_path = pooling_path / "prior-qrels.txt"
+    inputs = [pooling_path / "judgment-pool.json", *prior_qrels]
+    if not _is_up_to_date(output_path, manifest, inputs, {}):
+        from cli.evaluation import read_qrels
+
+        pooled = {(str(qid), str(docno)) for qid, docnos in judgment_pool.items() for docno in docnos}
+        labels = {}
+        for qrels_path in prior_qrels:
+            for qid, docno, rel in read_qrels(qrels_path).itertuples(index=False):
+                if (qid, docno) in pooled:
+                    labels[(qid, docno)] = rel
+        with output_path.open("wt") as file:
+            for (qid, docno), rel in sorted(labels.items()):
+                file.write(f"{qid} 0 {docno} {rel}\n")
+        print(f"Found prior judgments for {len(labels)} of {len(pooled)} pooled pairs.")
+        _record(output_path, manifest, inputs, {})
+
+    with output_path.open("rt") as file:
+        return {tuple(line.split()[0:3:2]) for line in file if line.strip()}
+
+
+def write_doccano_judgment_pool(
+    path: Path,
+    judgment_pool,
+    manifest: BuildManifest | None = None,
+    near_duplicate_threshold: float | None = None,
+    prior_qrels: Sequence[Path] = (),
+    workers: int | None = None,
+):
+    config_data = json.load(open(path / "config.json"))
+    topics_path = path / config_data["topics"]
 
     doccano_judgment_pool_path = path / "doccano-judgment-pool.jsonl"
-    if doccano_judgment_pool_path.exists():
+    collapsed_path = path / "collapsed-near-duplicates.json"
+    doccano_inputs = [
+        path / "config.json",
+        topics_path,
+        path / "judgment-pool.json",
+        path / "topic-mapping.jsonl",
+        path / "documents.jsonl.gz",
+    ]
+    prior_qrels_path = path / "prior-qrels.txt"
+    doccano_params = {"near_duplicate_threshold": near_duplicate_threshold, "prior_qrels": sorted(str(i) for i in prior_qrels)}
+    if near_duplicate_threshold is not None:
+        # Only one document per cluster of near-duplicates is judged, export-relevance-judgments copies its label to the others.
+        collapsed = collapse_pool(judgment_pool, get_near_duplicates(path, judgment_pool, near_duplicate_threshold, manifest, workers))
+        doccano_inputs.append(path / "near-duplicates.json")
+    else:
+        collapsed = {}
+    if len(prior_qrels) > 0:
+        # Pairs judged in earlier qrels are not judged again, export-relevance-judgments merges their labels back in.
+        judged = get_prior_judgments(path, judgment_pool, prior_qrels, manifest)
+        doccano_inputs.append(prior_qrels_path)
+    else:
+        judged = set()
+    if _is_up_to_date(doccano_judgment_pool_path, manifest, doccano_inputs, doccano_params):
         print(f'Exists "{doccano_judgment_pool_path}". I do not override')
         return
 
+    if not (path / "topic-mapping.jsonl").exists():
+        print(f'Missing "{path / "topic-mapping.jsonl"}". Create it, e.g., with assign-topics, and run the pooling again.')
+        return
+
     if str(topics_path).endswith(".xml"):
         topic_to_title = load_topics_dict(
             topics_path=topics_path,
@@ -309,14 +930,7 @@ def pool_documents(
             topic_to_narrative[qid] = i["narrative"]
 
     with doccano_judgment_pool_path.open("wt") as file:
-        if 'irds-id' in config_data:
-            docs_store = irds_load(config_data["irds-id"]).docs_store()
-        else:
-            docs_store = {}
-            with gzip.open(path / "documents.jsonl.gz", "rt") as f:
-                for l in f:
-                    l = json.loads(l)
-                    docs_store[l["docno"]] = l
+        docs_store = _judgment_docs_store(path)
 
         with open(path / "topic-mapping.jsonl", "r") as f:
             doc_count = 0
@@ -326,16 +940,20 @@ def pool_documents(
                 i = json.loads(i)
                 group = i["account"]
                 for topic in i["topics"]:
+                    duplicates = {docno for docnos in collapsed.get(topic, {}).values() for docno in docnos}
                     for document in judgment_pool[topic]:
-                        if document not in docs_store:
+                        if document in duplicates or (str(topic), str(document)) in judged:
+                            continue
+                        doc = docs_store.get(document)
+                        if doc is None:
                             print(f"Skip document with id {document}")
                             continue
-                        main_content = docs_store.get(document)["text"]
+                        main_content = doc["text"]
                         if len(main_content) < 10:
                             main_content = "No Main Content"
                             no_main_content += 1
-                        if len(main_content) > 7*1000:
-                            main_content = main_content[:7*1000]
+                        if len(main_content) > _MAX_TEXT_LENGTH:
+                            main_content = main_content[:_MAX_TEXT_LENGTH]
                             skipped_long += 1
                         doc_count += 1
                         file.write(
@@ -347,14 +965,23 @@ def pool_documents(
                                      "description": topic_to_description[topic],
                                      "narrative": topic_to_narrative[topic],
                                      "doc_id": document,
-                                     "url": docs_store.get(document)["url"],
-                                     "title": docs_store.get(document)["title"],
+                                     "url": doc["url"],
+                                     "title": doc["title"],
                                      "text": main_content,
                         }
                     )
                     + "\n"
                 )
             print(f"Docs to judge {doc_count}. No main content {no_main_content}. Truncated: {skipped_long}")
+    if near_duplicate_threshold is not None:
+        with collapsed_path.open("wt") as file:
+            dump(collapsed, file)
+        print(f"Collapsed {sum(len(j) for i in collapsed.values() for j in i.values())} near-duplicates.")
+    elif collapsed_path.exists():
+        collapsed_path.unlink()
+    if len(prior_qrels) == 0 and prior_qrels_path.exists():
+        prior_qrels_path.unlink()
+    _record(doccano_judgment_pool_path, manifest, doccano_inputs, doccano_params)
 
 
 def read_tira_invites(invite_path: Path):
@@ -394,13 +1021,66 @@ def to_jsonl_query(query):
     ret["original_query"] = ret.copy()
     return json.dumps(ret)
 
-def subsample_corpus(qrels_path: Path, pooling_path: Path, pooling_depth: int):
+def build_bundle(inputs_dir: Path, bundle_dir: Path, manifest: BuildManifest | None = None):
+    """
+    Prebuild the artifacts that downstream users would otherwise rebuild from documents.jsonl.gz:
+    a PyTerrier index (loadable with IndexFactory.of), an offset-indexed docstore, and a docno lookup table.
+    The internal document IDs of the index match the positions in the docstore and in docnos.txt.
+    The checksums of all files are written to checksums.sha256 (verifiable with `sha256sum -c`).
+    """
+    inputs = [inputs_dir / "documents.jsonl.gz"]
+    if manifest is None and (bundle_dir / "checksums.sha256").exists():
+        return
+    if manifest is not None and manifest.is_fresh(bundle_dir, inputs, {}):
+        return
+
+    with gzip_open(inputs_dir / "documents.jsonl.gz", "rt") as file:
+        documents = sorted((loads(line) for line in file), key=lambda i: i["docno"])
+    docstore_dir = bundle_dir / "docstore"
+    OffsetDocumentStore.write(tqdm(documents, "Docstore"), docstore_dir)
+
+    index_dir = bundle_dir / "pyterrier-index"
+    indexer = IterDictIndexer(
+        str(index_dir.absolute()),
+        meta={"docno": max((len(i["docno"]) for i in documents), default=20)},
+    )
+    indexer.index(tqdm(documents, "Index"))
+
+    files = sorted(i for i in bundle_dir.rglob("*") if i.is_file())
+    with (bundle_dir / "checksums.sha256").open("wt") as file:
+        for path in files:
+            file.write(f"{file_sha256(path)}  {path.relative_to(bundle_dir)}\n")
+    _record(bundle_dir, manifest, inputs, {})
+
+
+@cache
+def _load_dataset(ir_datasets_id: str):
+    # Courses on the same corpus share the dataset and its (possibly huge) docstore.
+    return irds_load(ir_datasets_id)
+
+
+def subsample_corpora(course_paths: Sequence[Path], pooling_depth: int, bundle: bool = False, jobs: int = 1):
+    """
+    Subsample the corpora of several course directories in one process, up to `jobs` courses at the same time.
+    """
+    scheduler = StageScheduler(jobs=jobs)
+    for course_path in course_paths:
+        scheduler.add(str(course_path), partial(subsample_corpus, course_path / 'qrels.txt', course_path, pooling_depth, bundle))
+    scheduler.run()
+
+
+def subsample_corpus(qrels_path: Path, pooling_path: Path, pooling_depth: int, bundle: bool = False):
     inputs_dir = pooling_path / 'subsampled-dataset' / 'inputs'
     truths_dir = pooling_path / 'subsampled-dataset' / 'truths'
-    if (inputs_dir / 'documents.jsonl.gz').exists():
+    manifest = BuildManifest(pooling_path)
+    inputs = [qrels_path, pooling_path / 'metadata.json', qrels_path.parent / 'topics.xml', *sorted(pooling_path.glob("*-run.gz"))]
+    params = {"depth": pooling_depth}
+    if _is_up_to_date(inputs_dir / 'documents.jsonl.gz', manifest, inputs, params):
+        if bundle:
+            build_bundle(inputs_dir, pooling_path / 'subsampled-dataset' / 'bundle', manifest)
         return
     meta_data = json.load(open(pooling_path / 'metadata.json'))
-    dataset = irds_load(meta_data['ir_datasets_id'])
+    dataset = _load_dataset(meta_data['ir_datasets_id'])
     docs_store = dataset.docs_store()
     queries_dict = {}
     
@@ -475,23 +1155,52 @@ def subsample_corpus(qrels_path: Path, pooling_path: Path, pooling_depth: int):
             f.write(json.dumps({"docno": doc, "text": doc_text}) + '\n')
             f.flush()
 
+    _record(inputs_dir / 'documents.jsonl.gz', manifest, inputs, params)
+    if bundle:
+        build_bundle(inputs_dir, pooling_path / 'subsampled-dataset' / 'bundle', manifest)
 
-def create_group(
+
+def _checked(response: Any, *keys: str) -> Any:
+    """
+    Raise a FailedResponse if the TIRA response lacks the nested keys or reports an error status.
+    """
+    value = response
+    try:
+        for key in keys:
+            value = value[key]
+    except (KeyError, IndexError, TypeError):
+        raise FailedResponse(f"Unexpected response from TIRA: {str(response)[:200]}")
+    if isinstance(response, dict) and str(response.get("status", 0)) not in ("0", "200"):
+        raise FailedResponse(f"Failed response from TIRA: {str(response)[:200]}")
+    return response
+
+
+def create_groups(
     invite_path: Path,
     tira_task_id: str,
-    group_name: str,
+    group_names: Collection[str],
     affiliation: str,
     country: str,
+    rate_limiter: AdaptiveRateLimiter | None = None,
 ):
+    if rate_limiter is None:
+        rate_limiter = AdaptiveRateLimiter()
     all_invites = read_tira_invites(invite_path)
     tira = Client()
-    if group_name not in all_invites:
-        metadata_for_task = tira.metadata_for_task(tira_task_id)
-        time.sleep(1)
+    new_groups = [i for i in group_names if i not in all_invites]
+    print(f"Register {len(new_groups)} new groups ({len(all_invites)} already registered).")
+
+    failed_groups = []
+    if len(new_groups) > 0:
+        # Read the task metadata only once and allow all new groups in a single modification.
+        metadata_for_task = rate_limiter.call(
+            lambda: _checked(tira.metadata_for_task(tira_task_id), "context", "task", "allowed_task_teams")
+        )
         metadata_for_task = metadata_for_task["context"]["task"]
         allowed_teams = [
             i.strip() for i in metadata_for_task["allowed_task_teams"].split("\n")
-        ] + [group_name]
+        ]
+        allowed_teams += [i for i in new_groups if i not in allowed_teams]
         task_modification = {
             "featured": True,
             "require_registration": True,
@@ -499,25 +1208,55 @@ def create_group(
             "restrict_groups": True,
             "task_teams": "\n".join(allowed_teams),
         }
-        tira.modify_task(tira_task_id, task_modification)
-        time.sleep(1)
-        invite = tira.register_group(
-            group_name,
-            tira_task_id,
-            name="no-name",
-            email="no-mail",
-            affiliation=affiliation,
-            country=country,
-        )
-        all_invites[group_name] = invite
+        rate_limiter.call(lambda: _checked(tira.modify_task(tira_task_id, task_modification)))
 
-        with open(invite_path, "w") as f:
-            f.write(json.dumps(all_invites))
-        all_invites = read_tira_invites(invite_path)
-        time.sleep(8)
+        for group_name in tqdm(new_groups, "Register groups"):
+            try:
+                # Registrations are not idempotent, so they are never re-tried, but failures still slow down the next ones.
+                invite = rate_limiter.call_once(
+                    lambda: _checked(
+                        tira.register_group(
+                            group_name,
+                            tira_task_id,
+                            name="no-name",
+                            email="no-mail",
+                            affiliation=affiliation,
+                            country=country,
+                        ),
+                        "context",
+                        "created_group",
+                    )
+                )
+            except FailedResponse as e:
+                # Not persisted, so that a later run registers the group again.
+                print(f"Could not register {group_name} ({e}). Check in TIRA that it does not exist before re-running.")
+                failed_groups.append(group_name)
+                continue
+            all_invites[group_name] = invite
 
-    print(
-        group_name
-        + ": "
-        + json.dumps(all_invites[group_name]["context"]["created_group"])
-    )
+            # Persist after every group so that an interrupted batch can be resumed.
+            with open(invite_path, "w") as f:
+                f.write(json.dumps(all_invites))
+
+    for group_name in group_names:
+        if group_name not in all_invites:
+            continue
+        try:
+            invite = _checked(all_invites[group_name], "context", "created_group")
+            print(group_name + ": " + json.dumps(invite["context"]["created_group"]))
+        except FailedResponse:
+            # Error responses stored by earlier versions, remove them from the invites to register the group again.
+            print(f"{group_name}: invalid invite in {invite_path}")
+            failed_groups.append(group_name)
+    if len(failed_groups) > 0:
+        print(f"Failed to register {len(failed_groups)} groups: {', '.join(failed_groups)}")
+
+
+def create_group(
+    invite_path: Path,
+    tira_task_id: str,
+    group_name: str,
+    affiliation: str,
+    country: str,
+):
+    create_groups(invite_path, tira_task_id, [group_name], affiliation, country)
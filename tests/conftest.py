@@ -0,0 +1,47 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from json import dumps
+from threading import Thread
+from typing import Any, Callable, Iterator
+
+from pytest import fixture
+
+# Answers a request (path with query string and body) with a status code and a JSON-serializable body.
+Responder = Callable[[str, bytes], tuple[int, Any]]
+
+
+@fixture
+def stand_in_server(tmp_path, monkeypatch) -> Iterator[Callable[[Responder], str]]:
+    """
+    Start local stand-in servers for remote APIs and return their base URLs.
+    The caches default to the test's temporary directory, so that tests neither read nor write the user's caches.
+    """
+    monkeypatch.setenv("TEACHING_IR_CACHE_DIR", str(tmp_path / "cache"))
+    servers = []
+
+    def start(respond: Responder) -> str:
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                self.do_POST()
+
+            def do_POST(self) -> None:
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                status, response = respond(self.path, body)
+                content = dumps(response).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+
+            def log_message(self, *args) -> None:
+                pass
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return f"http://127.0.0.1:{server.server_port}"
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
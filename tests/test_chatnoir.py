@@ -0,0 +1,109 @@
+from json import loads
+from urllib.parse import parse_qs, urlparse
+
+from pandas import DataFrame
+
+from cli.caching import RetrievalCache
+from cli.chatnoir import ChatNoirQueryExecutor
+
+_TOPICS = DataFrame({"qid": ["1", "2"], "query": ["first query", "second query"]})
+
+
+def _search_results(path: str, body: bytes) -> tuple[int, dict]:
+    request = loads(body)
+    assert path == "/api/v1/_search"
+    # Out of score order, as ChatNoir's results are not strictly ordered by score.
+    results = [
+        {"trec_id": f"{request['query']}-b", "score": 1.0},
+        {"trec_id": f"{request['query']}-a", "score": 2.0},
+        {"trec_id": None, "score": 3.0},
+        {"trec_id": f"{request['query']}-c", "score": 1.0},
+    ]
+    return 200, {"results": results[: request["size"]]}
+
+
+def test_retrieve_ranks_by_score(stand_in_server):
+    executor = ChatNoirQueryExecutor(base_url=stand_in_server(_search_results), requests_per_second=100)
+
+    run = executor.retrieve(_TOPICS, "msmarco-document-v2.1", "bm25", 4)
+
+    first = run[run["qid"] == "1"]
+    assert list(first["docno"]) == ["first query-a", "first query-b", "first query-c"]
+    assert list(first["rank"]) == [0, 1, 2]
+    assert len(run[run["qid"] == "2"]) == 3
+
+
+def test_retrieve_retries_server_errors(stand_in_server):
+    requests = []
+
+    def respond(path: str, body: bytes) -> tuple[int, dict]:
+        requests.append(path)
+        if len(requests) == 1:
+            return 503, {"error": "overloaded"}
+        return _search_results(path, body)
+
+    executor = ChatNoirQueryExecutor(base_url=stand_in_server(respond), requests_per_second=100)
+    executor._rate_limiter.max_delay = 0.1
+
+    run = executor.retrieve(_TOPICS.head(1), "msmarco-document-v2.1", "bm25", 2)
+
+    assert len(requests) == 2
+    assert list(run["docno"]) == ["first query-a", "first query-b"]
+
+
+def test_retrieval_cache_replays_rankings(stand_in_server, tmp_path):
+    requests = []
+
+    def respond(path: str, body: bytes) -> tuple[int, dict]:
+        requests.append(loads(body)["size"])
+        return _search_results(path, body)
+
+    executor = ChatNoirQueryExecutor(base_url=stand_in_server(respond), requests_per_second=100)
+    cache = RetrievalCache(tmp_path / "retrieval-cache.sqlite")
+
+    def retrieve(topics, depth):
+        return executor.retrieve(topics, "msmarco-document-v2.1", "bm25", depth)
+
+    deep = cache.retrieve(_TOPICS, retrieve, "chatnoir/msmarco-document-v2.1", "bm25", "title", 4)
+    shallow = cache.retrieve(_TOPICS, retrieve, "chatnoir/msmarco-document-v2.1", "bm25", "title", 2)
+
+    assert requests == [4, 4]
+    assert list(shallow["docno"]) == list(deep[deep["rank"] < 2]["docno"])
+
+
+def test_cache_contents(stand_in_server):
+    def respond(path: str, body: bytes) -> tuple[int, dict]:
+        url = urlparse(path)
+        assert url.path == "/cache"
+        return 200, {"index": parse_qs(url.query)["index"][0], "text": "contents"}
+
+    executor = ChatNoirQueryExecutor(base_url=stand_in_server(respond), requests_per_second=100)
+
+    assert loads(executor.cache_contents("msmarco_doc_00_0", "msmarco-document-v2.1")) == {
+        "index": "msmarco-v2.1",
+        "text": "contents",
+    }
+
+
+def test_responses_are_replayed_across_executors(stand_in_server, tmp_path):
+    requests = []
+
+    def respond(path: str, body: bytes) -> tuple[int, dict]:
+        requests.append(loads(body)["size"])
+        return _search_results(path, body)
+
+    base_url = stand_in_server(respond)
+
+    def retrieve(depth: int) -> DataFrame:
+        executor = ChatNoirQueryExecutor(base_url=base_url, cache_path=tmp_path / "responses.sqlite", requests_per_second=100)
+        return executor.retrieve(_TOPICS.head(1), "msmarco-document-v2.1", "bm25", depth)
+
+    retrieve(2)
+    shallow = retrieve(1)
+    # Deeper rankings are requested again, but a response with fewer results than requested is complete.
+    retrieve(5)
+    deep = retrieve(10)
+
+    assert requests == [2, 5]
+    assert list(shallow["docno"]) == ["first query-b"]
+    assert list(deep["docno"]) == ["first query-a", "first query-b", "first query-c"]
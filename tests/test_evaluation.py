@@ -0,0 +1,78 @@
+from gzip import open as gzip_open
+from math import log2
+from pathlib import Path
+
+from pytest import approx, raises
+
+from cli.evaluation import evaluate_runs, run_names
+
+# Topic 1 has a negative label (counts as unjudged, like in trec_eval) and a relevant document that is not retrieved,
+# topic 2 has no results (counts with zero scores, like trec_eval -c).
+_QRELS = """1 0 a 2
+1 0 b 0
+1 0 c 1
+1 0 d 1
+1 0 e -1
+2 0 x 1
+"""
+_RUN = """1 Q0 a 1 3.0 r
+1 Q0 u 2 2.0 r
+1 Q0 b 3 1.5 r
+1 Q0 c 4 1.0 r
+1 Q0 e 5 0.5 r
+"""
+
+
+def _write(path: Path, text: str) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with gzip_open(path, "wt") as file:
+        file.write(text)
+    return path
+
+
+def test_evaluate_runs(tmp_path):
+    qrels_path = tmp_path / "qrels.txt"
+    qrels_path.write_text(_QRELS)
+    run_path = _write(tmp_path / "runs" / "r.gz", _RUN)
+
+    leaderboard, per_topic = evaluate_runs(qrels_path, [run_path], cutoffs=(5,))
+
+    # Topic 1 by hand: gains 2 and 1 at ranks 1 and 4, ideal gains 2, 1, 1; relevant at ranks 1 and 4 of 3 relevant;
+    # one judged non-relevant document (b) above c; a, b, and c are judged.
+    ndcg = (2 + 1 / log2(5)) / (2 + 1 / log2(3) + 1 / 2)
+    expected = {"nDCG@5": ndcg, "P@5": 2 / 5, "MAP": (1 + 2 / 4) / 3, "bpref": 1 / 3, "judged@5": 3 / 5}
+    for measure, value in expected.items():
+        assert leaderboard.loc["r", measure] == approx(value / 2)
+        topic_scores = per_topic[per_topic["measure"] == measure].set_index("qid")["score"]
+        assert topic_scores["1"] == approx(value)
+        assert topic_scores["2"] == 0
+
+
+def test_ties_are_broken_like_trec_eval(tmp_path):
+    qrels_path = tmp_path / "qrels.txt"
+    qrels_path.write_text("1 0 b 1\n")
+    # With equal scores, trec_eval ranks the higher document ID first.
+    run_path = _write(tmp_path / "runs" / "r.gz", "1 Q0 a 1 1.0 r\n1 Q0 b 2 1.0 r\n")
+
+    leaderboard, _ = evaluate_runs(qrels_path, [run_path], cutoffs=(1,))
+
+    assert leaderboard.loc["r", "P@1"] == 1
+
+
+def test_same_named_runs_in_different_directories(tmp_path):
+    qrels_path = tmp_path / "qrels.txt"
+    qrels_path.write_text(_QRELS)
+    first = _write(tmp_path / "baselines" / "r.gz", _RUN)
+    second = _write(tmp_path / "students" / "r.gz", "1 Q0 b 1 1.0 r\n")
+    other = _write(tmp_path / "students" / "s.gz", "1 Q0 a 1 1.0 r\n")
+
+    leaderboard, _ = evaluate_runs(qrels_path, [first, second, other], cutoffs=(5,))
+
+    assert sorted(leaderboard.index) == ["baselines/r", "s", "students/r"]
+    assert leaderboard.loc["students/r", "P@5"] == 0
+    assert leaderboard.loc["baselines/r", "P@5"] == approx(0.2)
+
+
+def test_run_names_fail_on_ambiguous_runs(tmp_path):
+    with raises(ValueError):
+        run_names([tmp_path / "a" / "runs" / "r.gz", tmp_path / "b" / "runs" / "r.gz"])
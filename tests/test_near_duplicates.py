@@ -0,0 +1,57 @@
+from pandas import DataFrame
+
+from cli.near_duplicates import collapse_pool, find_near_duplicates, propagate_judgments
+
+
+def _words(start: int, end: int) -> str:
+    return " ".join(f"word{i}" for i in range(start, end))
+
+
+def _jaccard(a: str, b: str) -> float:
+    a, b = set(a.split()), set(b.split())
+    return len(a & b) / len(a | b)
+
+
+def test_clusters_do_not_chain():
+    # a~b and b~c are above the threshold (8/12 words shared), but a~c is not (6/14).
+    documents = {"a": _words(0, 10), "b": _words(2, 12), "c": _words(4, 14), "other": _words(100, 110)}
+
+    clusters = find_near_duplicates(documents, threshold=0.6, num_perm=256, shingle_size=1)
+
+    assert len(clusters) == 1
+    assert clusters[0] in (["a", "b"], ["b", "a"], ["b", "c"], ["c", "b"])
+    representative, *members = clusters[0]
+    assert all(_jaccard(documents[representative], documents[i]) >= 0.6 for i in members)
+
+
+def test_representative_is_the_longest_text_that_fits():
+    text = _words(0, 50)
+    documents = {"short": text, "medium": text + " !", "long": text + " !!!", "longest": text + " !!!!!", "unrelated": _words(50, 100)}
+
+    assert find_near_duplicates(documents) == [["longest", "long", "medium", "short"]]
+    assert find_near_duplicates(documents, max_length=len(text) + 3) == [["medium", "short", "long", "longest"]]
+    assert find_near_duplicates(documents, max_length=len(text) - 1) == [["short", "medium", "long", "longest"]]
+
+
+def test_documents_without_words_are_never_clustered():
+    assert find_near_duplicates({"a": "", "b": "!!", "c": _words(0, 10)}) == []
+
+
+def test_judgments_propagate_to_collapsed_members():
+    clusters = [["medium", "short", "long"]]
+    pool = {"1": ["short", "long", "unrelated"], "2": ["long", "medium"], "3": ["long", "unrelated"]}
+
+    collapsed = collapse_pool(pool, clusters)
+
+    assert collapsed == {"1": {"short": ["long"]}, "2": {"medium": ["long"]}}
+
+    qrels = DataFrame(
+        [("1", "short", 2), ("1", "unrelated", 0), ("2", "medium", 1), ("2", "long", 0)],
+        columns=["query_id", "doc_id", "label"],
+    )
+    propagated = propagate_judgments(qrels, collapsed)
+
+    # The judged near-duplicate of topic 2 keeps its own judgment.
+    assert sorted(propagated.itertuples(index=False, name=None)) == sorted(
+        [*qrels.itertuples(index=False, name=None), ("1", "long", 2)]
+    )
@@ -0,0 +1,37 @@
+from json import loads
+
+from cli.passages import PassageIdResolver
+
+
+def _passages(path: str, body: bytes) -> tuple[int, dict]:
+    assert path == "/segmented/_msearch"
+    lines = [loads(i) for i in body.decode("utf-8").splitlines()]
+    responses = []
+    for search in lines[1::2]:
+        doc_id = search["query"]["prefix"]["warc_trec_id"].rstrip("#")
+        hits = [{"_source": {"warc_trec_id": f"{doc_id}#{i}"}} for i in (2, 1, 2)]
+        responses.append({"hits": {"hits": hits}})
+    return 200, {"responses": responses}
+
+
+def test_resolve_batches_and_caches(stand_in_server, tmp_path):
+    requests = []
+
+    def respond(path: str, body: bytes) -> tuple[int, dict]:
+        requests.append(len(body.decode("utf-8").splitlines()) // 2)
+        return _passages(path, body)
+
+    host = stand_in_server(respond)
+    resolver = PassageIdResolver(host=host, index="segmented", cache_path=tmp_path / "passages.sqlite", batch_size=2)
+
+    assert resolver.resolve(["doc-b", "doc-a", "doc-c", "doc-a"]) == {
+        "doc-a": ["doc-a#1", "doc-a#2"],
+        "doc-b": ["doc-b#1", "doc-b#2"],
+        "doc-c": ["doc-c#1", "doc-c#2"],
+    }
+    assert requests == [2, 1]
+
+    # Cached document IDs are not requested again, also not by a new resolver.
+    resolver = PassageIdResolver(host=host, index="segmented", cache_path=tmp_path / "passages.sqlite", batch_size=2)
+    assert resolver.resolve(["doc-a", "doc-d"])["doc-d"] == ["doc-d#1", "doc-d#2"]
+    assert requests == [2, 1, 1]
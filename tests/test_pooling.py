@@ -0,0 +1,85 @@
+from pathlib import Path
+
+from pytest import approx, mark
+from trectools import TrecPoolMaker, TrecRun
+
+from cli.pooling import estimate_recall, make_pool, runs_to_frame
+
+
+def _runs(tmp_path: Path) -> list[TrecRun]:
+    rankings = {
+        "a": {"1": "d1 d2 d3 d4 d5 d6", "2": "d7 d8 d9"},
+        "b": {"1": "d2 d1 d7 d8 d9 d10", "2": "d9 d10 d11 d12"},
+        "c": {"1": "d11 d3 d1 d12", "2": "d13 d7"},
+    }
+    runs = []
+    for name, topics in rankings.items():
+        lines = [
+            f"{topic} Q0 {docid} {rank} {100 - rank} {name}"
+            for topic, docids in topics.items()
+            for rank, docid in enumerate(docids.split(), start=1)
+        ]
+        path = tmp_path / f"{name}.txt"
+        path.write_text("\n".join(lines) + "\n")
+        runs.append(TrecRun(str(path)))
+    return runs
+
+
+@mark.parametrize("depth", [1, 2, 5, 100])
+def test_top_x_pool_equals_trec_pool_maker(tmp_path, depth):
+    runs = _runs(tmp_path)
+
+    pool, _ = make_pool(runs, "topX", depth)
+
+    expected = TrecPoolMaker().make_pool(runs, strategy="topX", topX=depth).pool
+    assert {topic: set(docids) for topic, docids in pool.items()} == {str(k): v for k, v in expected.items()}
+
+
+@mark.parametrize("strategy", ["rrf", "rbp", "mtf"])
+@mark.parametrize("budget", [1, 3, 7])
+def test_per_topic_budget_is_never_exceeded(tmp_path, strategy, budget):
+    pool, _ = make_pool(_runs(tmp_path), strategy, 10, budget, {"1": ["d2"]})
+
+    assert set(pool) == {"1", "2"}
+    assert all(0 < len(docids) <= budget for docids in pool.values())
+
+
+@mark.parametrize("budget", [0, 1, 4, 9, 100])
+def test_adaptive_depth_budget_is_never_exceeded(tmp_path, budget):
+    runs = _runs(tmp_path)
+
+    pool, recall = make_pool(runs, "adaptive-depth", 10, budget)
+
+    all_documents = sum(len(docids) for docids in make_pool(runs, "topX", 100)[0].values())
+    assert sum(len(docids) for docids in pool.values()) <= budget
+    if budget >= all_documents:
+        assert recall == approx({"1": 1.0, "2": 1.0})
+
+
+def test_pools_follow_the_scores_not_the_file_order(tmp_path):
+    # The ranks and the file order contradict the scores: d3 has the highest score.
+    path = tmp_path / "run.txt"
+    path.write_text("1 Q0 d1 1 0.1 r\n1 Q0 d2 2 0.2 r\n1 Q0 d3 3 0.3 r\n")
+    run = TrecRun(str(path))
+    run.run_data = run.run_data.iloc[::-1]
+
+    assert list(runs_to_frame([run])["docid"]) == ["d3", "d2", "d1"]
+    assert make_pool([run], "topX", 1)[0] == {"1": ["d3"]}
+    assert make_pool([run], "rrf", 10, 2)[0] == {"1": ["d3", "d2"]}
+    assert make_pool([run], "topX", 10)[0] == {"1": ["d3", "d2", "d1"]}
+
+
+def test_estimate_recall(tmp_path):
+    runs_df = runs_to_frame(_runs(tmp_path))
+
+    assert estimate_recall(runs_df, {"1": [], "2": []}) == approx({"1": 0.0, "2": 0.0})
+    full = {topic: set(docids) for topic, docids in runs_df.groupby("query")["docid"]}
+    assert estimate_recall(runs_df, full) == approx({"1": 1.0, "2": 1.0})
+    shallow = estimate_recall(runs_df, {"1": {"d1", "d2"}, "2": {"d7"}})
+    deeper = estimate_recall(runs_df, {"1": {"d1", "d2", "d11"}, "2": {"d7", "d9"}})
+    assert all(0 < shallow[topic] < deeper[topic] < 1 for topic in ("1", "2"))
+
+
+@mark.parametrize("strategy", ["topX", "rrf", "rbp", "mtf", "adaptive-depth"])
+def test_empty_runs(strategy):
+    assert make_pool([], strategy, 10, 10) == ({}, {})
@@ -0,0 +1,61 @@
+from gzip import open as gzip_open
+
+from pytest import mark
+
+from cli.run_validation import validate_run
+
+
+@mark.parametrize(
+    "content, topic_ids, lines, topics, errors, warnings",
+    [
+        ("1 Q0 a 1 3 t\n1 Q0 b 2 2 t\n2 Q0 a 1 1 t\n", {"1", "2"}, 3, 2, "", ""),
+        ("1 Q0 a 1 3 t\n1 Q0 b 2\n1 Q0 c 3 1 t extra\n", None, 3, 1, "2 lines without 6 columns (e.g., line 2, 3)", ""),
+        # Blank lines are skipped, but count for the line numbers.
+        ("1 Q0 a 1 2 t\n\n1 Q0 b 2 1 t\n", None, 2, 1, "", ""),
+        ("1 Q0 a 1 2 t\n\n   \n1 Q0 b 2\n1 Q0 c 3 1 t\n", None, 3, 1, "1 lines without 6 columns (e.g., line 4)", ""),
+        ("1 Q0 a 1 3 t\n1 Q0 a 2 2 t\n", None, 2, 1, "1 duplicate documents per topic (e.g., 1/a)", ""),
+        (
+            "1 Q0 a one 3 t\n1 Q0 b 2 high t\n1 Q0 c 3 1 t\n",
+            None,
+            3,
+            1,
+            "1 non-numeric ranks (e.g., one); 1 non-numeric scores (e.g., high)",
+            "",
+        ),
+        (
+            # Topic 1 has an increasing score, topic 2 a shared rank.
+            "1 Q0 a 1 1 t\n1 Q0 b 2 2 t\n2 Q0 a 1 2 t\n2 Q0 b 1 1 t\n3 Q0 a 1 2 t\n",
+            None,
+            5,
+            3,
+            "ranks contradict the scores in 2 topics (e.g., 1, 2)",
+            "",
+        ),
+        (
+            "1 Q0 a 1 3 t\n9 Q0 a 1 3 u\n",
+            {"1", "2"},
+            2,
+            2,
+            "1 unknown topics (e.g., 9)",
+            "no results for 1 topics (e.g., 2); 2 different run tags (e.g., t, u)",
+        ),
+        ("", None, 0, 0, "no valid lines", ""),
+        ("\n\n", None, 0, 0, "no valid lines", ""),
+    ],
+)
+def test_validate_run(tmp_path, content, topic_ids, lines, topics, errors, warnings):
+    path = tmp_path / "run.gz"
+    with gzip_open(path, "wt") as file:
+        file.write(content)
+
+    result = validate_run(path, topic_ids)
+
+    assert result == {
+        "run": "run.gz",
+        "path": str(path),
+        "valid": errors == "",
+        "lines": lines,
+        "topics": topics,
+        "errors": errors,
+        "warnings": warnings,
+    }
@@ -0,0 +1,50 @@
+from numpy import array
+from numpy.random import default_rng
+from pandas import DataFrame
+from pandas.testing import assert_frame_equal
+from pytest import approx, mark
+
+from cli.significance import correct_p_values, significance_tests
+
+
+def _scores() -> DataFrame:
+    rng = default_rng(42)
+    base = rng.uniform(size=20)
+    return DataFrame(
+        [base, base + 0.1, base + rng.normal(0, 0.05, 20), base],
+        index=["a", "b", "c", "d"],
+        columns=[str(i) for i in range(20)],
+    )
+
+
+def test_p_values_do_not_depend_on_the_number_of_jobs():
+    matrix, details = significance_tests(_scores(), trials=500, seed=3, jobs=1)
+
+    for jobs in (2, 3):
+        other_matrix, other_details = significance_tests(_scores(), trials=500, seed=3, jobs=jobs)
+        assert_frame_equal(matrix, other_matrix)
+        assert_frame_equal(details, other_details)
+
+
+def test_identical_runs_are_not_significantly_different():
+    _, details = significance_tests(_scores(), trials=500, correction="none", jobs=1)
+
+    identical = details[details[["run_a", "run_b"]].apply(set, axis=1) == {"a", "d"}]
+    assert len(identical) == 1
+    assert identical["p_value"].item() == 1
+    assert identical["ci_low"].item() == identical["ci_high"].item() == 0
+    shifted = details[details[["run_a", "run_b"]].apply(set, axis=1) == {"a", "b"}]
+    assert shifted["p_value"].item() == approx(1 / 501)
+
+
+@mark.parametrize(
+    "method, expected",
+    [
+        ("none", [0.01, 0.04, 0.03, 0.2]),
+        ("bonferroni", [0.04, 0.16, 0.12, 0.8]),
+        ("holm", [0.04, 0.09, 0.09, 0.2]),
+        ("fdr_bh", [0.04, 0.16 / 3, 0.16 / 3, 0.2]),
+    ],
+)
+def test_correct_p_values(method, expected):
+    assert list(correct_p_values(array([0.01, 0.04, 0.03, 0.2]), method)) == approx(expected)
@@ -0,0 +1,66 @@
+from pandas import DataFrame
+from pytest import approx, importorskip
+
+from cli.sparse_retrieval import SparseIndex, analyze
+
+_DOCUMENTS = [
+    {"docno": "d1", "text": "Relevance judgments for the retrieval of documents"},
+    {"docno": "d2", "text": "Retrieval models rank documents by the relevance of their terms to the query terms"},
+    {"docno": "d3", "text": "Pooling selects the documents that are judged for relevance"},
+    {"docno": "d4", "text": "Judging documents takes time, so the pools are small"},
+    {"docno": "d5", "text": "Nothing in common with the others"},
+]
+_TOPICS = DataFrame({"qid": ["1", "2", "3"], "query": ["document retrieval", "relevance judgments pooling", "unknown"]})
+
+
+def test_analyze():
+    # Stopwords are removed, the terms are stemmed, and overly long, numeric, or repetitive tokens are dropped.
+    assert analyze("The Relevance of generalizations, 12345 aaaaa a1b2 abcdefghijklmnopqrstuvwxyz!") == [
+        "relev",
+        "gener",
+        "a1b2",
+    ]
+
+
+def test_retrieve():
+    index = SparseIndex.build(_DOCUMENTS)
+
+    run = index.retrieve(_TOPICS, "BM25", 3)
+
+    assert set(run["qid"]) == {"1", "2"}
+    first = run[run["qid"] == "1"]
+    assert list(first["rank"]) == [0, 1, 2]
+    assert first["score"].is_monotonic_decreasing
+    assert set(first["docno"]) <= {"d1", "d2", "d3", "d4"}
+    # Only documents that match a query term are retrieved, even if fewer than the depth.
+    assert set(index.retrieve(_TOPICS, "BM25", 100)["docno"]) == {"d1", "d2", "d3", "d4"}
+
+
+def test_save_and_load(tmp_path):
+    index = SparseIndex.build(_DOCUMENTS)
+    index.save(tmp_path / "index")
+
+    loaded = SparseIndex.load(tmp_path / "index")
+
+    assert loaded.retrieve(_TOPICS, "BM25", 10).equals(index.retrieve(_TOPICS, "BM25", 10))
+
+
+def test_retrieve_like_terrier(tmp_path):
+    pyterrier = importorskip("pyterrier")
+    from cli.tirex import pyterrier_retrieve
+
+    index_path = tmp_path / "pyterrier-index"
+    pyterrier.IterDictIndexer(str(index_path), meta={"docno": 100}).index(_DOCUMENTS)
+    topics_path = tmp_path / "topics.xml"
+    topics_path.write_text(
+        "<topics>"
+        + "".join(f"<topic number='{qid}'><query>{query}</query></topic>" for qid, query in zip(_TOPICS["qid"], _TOPICS["query"]))
+        + "</topics>"
+    )
+    pyterrier_retrieve("query", topics_path, tmp_path, pyterrier.IndexFactory.of(str(index_path)), "BM25", 10)
+    expected = pyterrier.io.read_results(str(tmp_path / "run-pt-query-BM25-10.gz"))
+
+    run = SparseIndex.build(_DOCUMENTS).retrieve(_TOPICS, "BM25", 10)
+
+    assert list(run["qid"].astype(str) + "/" + run["docno"]) == list(expected["qid"].astype(str) + "/" + expected["docno"])
+    assert list(run["score"]) == approx(list(expected["score"]), rel=1e-6)